@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.mysql_connection import get_read_db
+from app.utils.helper import verify_access_token
+from app.services.feed_service import get_feed
+from app.responses.post_response import PostsPageResponse
+
+router = APIRouter()
+
+# Async so the MongoDB read runs on the event loop; the SQL parts go to the threadpool
+@router.get("", response_model=PostsPageResponse)
+async def get_home_feed(limit: int = Query(settings.FEED_PAGE_SIZE, ge=1, le=settings.FEED_MAX_PAGE_SIZE), cursor: Optional[str] = None, size: Optional[int] = None, db: Session = Depends(get_read_db), current_user_id: int = Depends(verify_access_token)):
+    return ORJSONResponse(await get_feed(db, current_user_id, limit, cursor, size))
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.mysql_connection import get_db, get_read_db
+from app.models.friend_request import FriendRequestStatus
+from app.utils.helper import verify_access_token
+from app.services.friend_service import send_friend_request, list_friend_requests, respond_to_friend_requests
+from app.requests.send_friend_request import SendFriendRequest
+from app.requests.friend_request_batch_request import FriendRequestBatchRequest
+from app.responses.friend_response import (
+    SendFriendRequestResponse, FriendRequestsPageResponse, AcceptFriendRequestsResponse, DeclineFriendRequestsResponse,
+)
+
+router = APIRouter()
+
+PageSize = Query(settings.FRIENDS_PAGE_SIZE, ge=1, le=settings.FRIENDS_MAX_PAGE_SIZE)
+
+@router.post("", response_model=SendFriendRequestResponse)
+def send_request(send_request: SendFriendRequest, db: Session = Depends(get_db), current_user_id: int = Depends(verify_access_token)):
+    request_id = send_friend_request(db, current_user_id, send_request.receiver_id)
+    return {"message": "Friend request sent", "request_id": request_id}
+
+@router.get("/inbox", response_model=FriendRequestsPageResponse)
+def get_inbox(status: FriendRequestStatus = FriendRequestStatus.pending, limit: int = PageSize, cursor: Optional[str] = None, size: Optional[int] = None, db: Session = Depends(get_read_db), current_user_id: int = Depends(verify_access_token)):
+    return ORJSONResponse(list_friend_requests(db, current_user_id, "inbox", status, limit, cursor, size))
+
+@router.get("/outbox", response_model=FriendRequestsPageResponse)
+def get_outbox(status: FriendRequestStatus = FriendRequestStatus.pending, limit: int = PageSize, cursor: Optional[str] = None, size: Optional[int] = None, db: Session = Depends(get_read_db), current_user_id: int = Depends(verify_access_token)):
+    return ORJSONResponse(list_friend_requests(db, current_user_id, "outbox", status, limit, cursor, size))
+
+@router.post("/accept", response_model=AcceptFriendRequestsResponse)
+def accept_requests(batch_request: FriendRequestBatchRequest, db: Session = Depends(get_db), current_user_id: int = Depends(verify_access_token)):
+    return respond_to_friend_requests(db, current_user_id, batch_request.request_ids, accept=True)
+
+@router.post("/decline", response_model=DeclineFriendRequestsResponse)
+def decline_requests(batch_request: FriendRequestBatchRequest, db: Session = Depends(get_db), current_user_id: int = Depends(verify_access_token)):
+    return respond_to_friend_requests(db, current_user_id, batch_request.request_ids, accept=False)
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.mysql_connection import get_read_db
+from app.utils.helper import verify_access_token
+from app.services.friend_service import list_friends, count_mutual_friends, suggest_friends
+from app.responses.friend_response import FriendsPageResponse, MutualFriendsResponse, FriendSuggestionsResponse
+
+router = APIRouter()
+
+PageSize = Query(settings.FRIENDS_PAGE_SIZE, ge=1, le=settings.FRIENDS_MAX_PAGE_SIZE)
+
+@router.get("", response_model=FriendsPageResponse)
+def get_my_friends(limit: int = PageSize, cursor: Optional[str] = None, size: Optional[int] = None, db: Session = Depends(get_read_db), current_user_id: int = Depends(verify_access_token)):
+    # Rows come straight from the query in their response shape, so skip response_model revalidation
+    return ORJSONResponse(list_friends(db, current_user_id, limit, cursor, size))
+
+# Declared before /{user_id} so these paths aren't taken for a user id
+@router.get("/suggestions", response_model=FriendSuggestionsResponse)
+def get_friend_suggestions(limit: int = Query(10, ge=1, le=50), size: Optional[int] = None, db: Session = Depends(get_read_db), current_user_id: int = Depends(verify_access_token)):
+    return ORJSONResponse(suggest_friends(db, current_user_id, limit, size))
+
+@router.get("/mutual/{user_id}", response_model=MutualFriendsResponse)
+def get_mutual_friends(user_id: int, db: Session = Depends(get_read_db), current_user_id: int = Depends(verify_access_token)):
+    return {"user_id": user_id, "mutual_friends": count_mutual_friends(db, current_user_id, user_id)}
+
+@router.get("/{user_id}", response_model=FriendsPageResponse)
+def get_user_friends(user_id: int, limit: int = PageSize, cursor: Optional[str] = None, size: Optional[int] = None, db: Session = Depends(get_read_db), current_user_id: int = Depends(verify_access_token)):
+    return ORJSONResponse(list_friends(db, user_id, limit, cursor, size))
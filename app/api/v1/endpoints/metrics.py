@@ -0,0 +1,71 @@
+from fastapi import APIRouter
+from app.core.revocation_cache import revocation_cache
+from app.core.password_hasher import password_hasher
+from app.core.session_writer import jwt_session_writer
+from app.core.token_reaper import token_reaper
+from app.core.mysql_connection import engine, async_engine, replica_engines, async_replica_engines
+from app.core.db_pool_metrics import pool_status
+from app.core.user_profile_cache import user_profile_cache
+from app.core.availability_filter import availability_filter
+from app.core.friend_graph import friend_graph
+from app.core.feed_writer import feed_writer
+from app.core.image_store import profile_picture_store
+from app.core.static_files import static_memory_cache
+from app.core.structured_logging import log_pipeline
+
+router = APIRouter()
+
+@router.get("/revocation-cache")
+def get_revocation_cache_stats():
+    return revocation_cache.stats()
+
+@router.get("/password-hasher")
+def get_password_hasher_stats():
+    return password_hasher.stats()
+
+@router.get("/session-writer")
+def get_session_writer_stats():
+    return jwt_session_writer.stats()
+
+@router.get("/token-reaper")
+def get_token_reaper_stats():
+    return {"last_run": token_reaper.last_run}
+
+@router.get("/db-pool")
+def get_db_pool_stats():
+    pools = {"primary": pool_status(engine)}
+    if async_engine is not None:
+        pools["async"] = pool_status(async_engine.sync_engine)
+    for index, replica in enumerate(replica_engines):
+        pools[f"replica_{index}"] = pool_status(replica)
+    for index, replica in enumerate(async_replica_engines):
+        pools[f"async_replica_{index}"] = pool_status(replica.sync_engine)
+    return pools
+
+@router.get("/user-profile-cache")
+def get_user_profile_cache_stats():
+    return user_profile_cache.stats()
+
+@router.get("/availability-filter")
+def get_availability_filter_stats():
+    return availability_filter.stats()
+
+@router.get("/friend-graph")
+def get_friend_graph_stats():
+    return friend_graph.stats()
+
+@router.get("/feed-writer")
+def get_feed_writer_stats():
+    return feed_writer.stats()
+
+@router.get("/profile-picture-store")
+def get_profile_picture_store_stats():
+    return profile_picture_store.stats()
+
+@router.get("/static-cache")
+def get_static_cache_stats():
+    return static_memory_cache.stats()
+
+@router.get("/logging")
+def get_logging_stats():
+    return log_pipeline.stats()
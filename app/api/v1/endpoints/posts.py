@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.mysql_connection import get_db, get_read_db
+from app.utils.helper import verify_access_token
+from app.services.feed_service import create_post
+from app.services.post_service import list_user_posts, list_trip_posts
+from app.requests.create_post_request import CreatePostRequest
+from app.requests.validators import UtcDatetime
+from app.responses.post_response import CreatePostResponse, PostsPageResponse
+
+router = APIRouter()
+
+PageSize = Query(settings.POSTS_PAGE_SIZE, ge=1, le=settings.POSTS_MAX_PAGE_SIZE)
+
+@router.post("", response_model=CreatePostResponse)
+def create(post_request: CreatePostRequest, db: Session = Depends(get_db), current_user_id: int = Depends(verify_access_token)):
+    post = create_post(db, current_user_id, post_request)
+    return {"message": "Post created successfully", "post": post}
+
+@router.get("/trips", response_model=PostsPageResponse)
+def get_trip_posts(location: Optional[str] = None, start: Optional[UtcDatetime] = None, end: Optional[UtcDatetime] = None, limit: int = PageSize, cursor: Optional[str] = None, size: Optional[int] = None, db: Session = Depends(get_read_db), current_user_id: int = Depends(verify_access_token)):
+    return ORJSONResponse(list_trip_posts(db, location, start, end, limit, cursor, size))
+
+@router.get("/user/{user_id}", response_model=PostsPageResponse)
+def get_user_posts(user_id: int, limit: int = PageSize, cursor: Optional[str] = None, size: Optional[int] = None, db: Session = Depends(get_read_db), current_user_id: int = Depends(verify_access_token)):
+    return ORJSONResponse(list_user_posts(db, user_id, limit, cursor, size))
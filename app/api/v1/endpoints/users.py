@@ -1,34 +1,49 @@
 from fastapi import APIRouter, Request, Response, Cookie, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.utils.helper import *
 from app.services.user_service import *
-from app.core.mysql_connection import get_db
+from app.core.mysql_connection import get_db, get_read_db
 from app.requests.signup_request import SignupRequest
 from app.requests.signin_request import SigninRequest
 from app.requests.update_user_request import UpdateUserRequest
 from app.requests.change_password_request import ChangePasswordRequest
+from app.core.availability_filter import availability_filter
+from app.core.image_store import profile_picture_store
+from app.responses.user_response import SignupResponse, UserProfileResponse, UpdateUserResponse
 
 router = APIRouter()
 
-@router.post("/signup")
+@router.post("/signup", response_model=SignupResponse)
 def signup(signup_request: SignupRequest, db: Session = Depends(get_db)):
     # Create or restore user
     user = create_or_restore_user(db, signup_request)
     return {"message": "Registration successful", "user": user}
 
 
+@router.get("/availability")
+def check_availability(username: str | None = None, email: str | None = None, db: Session = Depends(get_read_db)):
+    if username is None and email is None:
+        raise HTTPException(status_code=400, detail="Provide a username or email to check")
+
+    # Answered from the in-memory filter unless it reports "maybe taken"
+    availability = {}
+    if username is not None:
+        availability["username"] = {"value": username, "available": not availability_filter.is_taken(db, "username", username)}
+    if email is not None:
+        availability["email"] = {"value": email, "available": not availability_filter.is_taken(db, "email", email)}
+    return availability
+
 @router.post("/signin")
 def signin(signin_request: SigninRequest, db: Session = Depends(get_db)):
+    # authenticate_user already checks the password, so bcrypt runs once per login
     user = authenticate_user(db, signin_request)
-    if not user or not verify_password(signin_request.password, user.password):
-        raise HTTPException(status_code=400, detail="Invalid credentials")
 
     access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     refresh_token = create_refresh_token()
     
-    store_jwt_session(db=db, user_id=user.id, access_token=access_token['token'], expiry=access_token['expiry'])
-    store_refresh_token(db=db, user_id=user.id, refresh_token=refresh_token)
+    issue_session(db=db, user_id=user.id, access_token=access_token['token'], expiry=access_token['expiry'], refresh_token=refresh_token)
     response = JSONResponse(content={"access_token": access_token['token']})
     response.set_cookie(key="refresh_token", value=refresh_token, httponly=True, max_age=86400)  # 7 days expiry
     return response
@@ -51,33 +66,38 @@ def logout(request: Request, response: Response, db: Session = Depends(get_db),
     return {"message": "Logged out successfully"}
 
 @router.get("/refresh-token")
-def refresh_token(response: Response, request: Request, refresh_token: str = Cookie(None), db: Session = Depends(get_db)):
+def refresh_token(response: Response, request: Request, refresh_token: str = Cookie(None), db: Session = Depends(get_db), read_db: Session = Depends(get_read_db)):
     # Verify the refresh token
     access_token = request.headers.get('authorization')
     if not access_token:
         raise HTTPException(status_code=401, detail="Authorization header missing")
     if refresh_token:
         payload = jwt_decode(access_token, {"verify_exp": False})
-        user_id = verify_refresh_token(refresh_token, payload.get('uid'), db)
+        request.state.user_id = payload.get('uid')
+        user_id = verify_refresh_token(refresh_token, payload.get('uid'), read_db)
         if not user_id:
             response.delete_cookie(key="refresh_token")
             raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
 
         # Generate a new access token
         new_access_token = create_access_token(data={"sub": payload.get('sub'), "uid": user_id})
-        store_jwt_session(db=db, user_id=user_id, access_token=new_access_token['token'], expiry=new_access_token['expiry'])
+        issue_session(db=db, user_id=user_id, access_token=new_access_token['token'], expiry=new_access_token['expiry'])
         return {"access_token": new_access_token['token']}
     
     raise HTTPException(status_code=401, detail="Invalid or expired refresh token") 
 
-@router.get("/user-profile")
-def get_user_profile(db: Session = Depends(get_db), user_id: int = Depends(verify_access_token)):
-    user = get_user_by_id(db, user_id, 'profile_picture')
-    return user
+@router.get("/user-profile", response_model=UserProfileResponse)
+def get_user_profile(db: Session = Depends(get_read_db), user_id: int = Depends(verify_access_token), size: Optional[int] = None):
+    # The cached profile is already in its JSON form, so skip response_model revalidation
+    profile = get_cached_user_profile(db, user_id)
+    if size and profile and profile["profile_picture"]:
+        # Point at the stored variant that covers the requested display size
+        profile = {**profile, "profile_picture": profile_picture_store.resolve(profile["profile_picture"], size)}
+    return ORJSONResponse(profile)
 
-@router.put("/update-profile")
+@router.put("/update-profile", response_model=UpdateUserResponse)
 def update_user_profile(update_request: UpdateUserRequest, db: Session = Depends(get_db), current_user_id: int = Depends(verify_access_token)):
-    updated_user = update_user(db, current_user_id, update_request.dict(exclude_unset=True))
+    updated_user = update_user(db, current_user_id, update_request.model_dump(exclude_unset=True))
     return {"message": "Profile updated successfully", "user": updated_user}
 
 @router.post("/upload-profile-picture")
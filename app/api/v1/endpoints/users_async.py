@@ -0,0 +1,116 @@
+# Event-loop versions of the endpoints in users.py, mounted instead of them when settings.DATABASE_ASYNC is on
+from fastapi import APIRouter, Request, Response, Cookie, Depends, HTTPException, UploadFile, File
+from fastapi.responses import JSONResponse, ORJSONResponse
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.helper import jwt_decode, verify_access_token_async, verify_refresh_token_async
+from app.services.user_service import create_access_token, create_refresh_token
+from app.services.async_user_service import *
+from app.core.mysql_connection import get_async_db, get_async_read_db
+from app.requests.signup_request import SignupRequest
+from app.requests.signin_request import SigninRequest
+from app.requests.update_user_request import UpdateUserRequest
+from app.requests.change_password_request import ChangePasswordRequest
+from app.core.availability_filter import availability_filter
+from app.core.image_store import profile_picture_store
+from app.responses.user_response import SignupResponse, UserProfileResponse, UpdateUserResponse
+
+router = APIRouter()
+
+@router.post("/signup", response_model=SignupResponse)
+async def signup(signup_request: SignupRequest, db: AsyncSession = Depends(get_async_db)):
+    # Create or restore user
+    user = await create_or_restore_user(db, signup_request)
+    return {"message": "Registration successful", "user": user}
+
+
+@router.get("/availability")
+async def check_availability(username: str | None = None, email: str | None = None, db: AsyncSession = Depends(get_async_read_db)):
+    if username is None and email is None:
+        raise HTTPException(status_code=400, detail="Provide a username or email to check")
+
+    # Answered from the in-memory filter unless it reports "maybe taken"
+    availability = {}
+    if username is not None:
+        availability["username"] = {"value": username, "available": not await availability_filter.is_taken_async(db, "username", username)}
+    if email is not None:
+        availability["email"] = {"value": email, "available": not await availability_filter.is_taken_async(db, "email", email)}
+    return availability
+
+@router.post("/signin")
+async def signin(signin_request: SigninRequest, db: AsyncSession = Depends(get_async_db)):
+    user = await authenticate_user(db, signin_request)
+
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
+    refresh_token = create_refresh_token()
+
+    await issue_session(db=db, user_id=user.id, access_token=access_token['token'], expiry=access_token['expiry'], refresh_token=refresh_token)
+    response = JSONResponse(content={"access_token": access_token['token']})
+    response.set_cookie(key="refresh_token", value=refresh_token, httponly=True, max_age=86400)
+    return response
+
+@router.post("/logout")
+async def logout(request: Request, response: Response, db: AsyncSession = Depends(get_async_db), current_user_id: int = Depends(verify_access_token_async)):
+    access_token = request.headers.get('Authorization')
+    type = request.query_params.get('type')
+    if type == 'all':
+        # Logout from all sessions
+        await logout_all_sessions(current_user_id, db)
+    else:
+        await blacklist_token(access_token, db)
+        refresh_token = request.cookies.get('refresh_token')
+        if refresh_token:
+            await delete_refresh_token(refresh_token, current_user_id, db)
+
+    response.delete_cookie("refresh_token")
+    return {"message": "Logged out successfully"}
+
+@router.get("/refresh-token")
+async def refresh_token(response: Response, request: Request, refresh_token: str = Cookie(None), db: AsyncSession = Depends(get_async_db), read_db: AsyncSession = Depends(get_async_read_db)):
+    # Verify the refresh token
+    access_token = request.headers.get('authorization')
+    if not access_token:
+        raise HTTPException(status_code=401, detail="Authorization header missing")
+    if refresh_token:
+        payload = jwt_decode(access_token, {"verify_exp": False})
+        request.state.user_id = payload.get('uid')
+        user_id = await verify_refresh_token_async(refresh_token, payload.get('uid'), read_db)
+        if not user_id:
+            response.delete_cookie(key="refresh_token")
+            raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+
+        # Generate a new access token
+        new_access_token = create_access_token(data={"sub": payload.get('sub'), "uid": user_id})
+        await issue_session(db=db, user_id=user_id, access_token=new_access_token['token'], expiry=new_access_token['expiry'])
+        return {"access_token": new_access_token['token']}
+
+    raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+
+@router.get("/user-profile", response_model=UserProfileResponse)
+async def get_user_profile(db: AsyncSession = Depends(get_async_read_db), user_id: int = Depends(verify_access_token_async), size: Optional[int] = None):
+    # The cached profile is already in its JSON form, so skip response_model revalidation
+    profile = await get_cached_user_profile(db, user_id)
+    if size and profile and profile["profile_picture"]:
+        # Point at the stored variant that covers the requested display size
+        profile = {**profile, "profile_picture": profile_picture_store.resolve(profile["profile_picture"], size)}
+    return ORJSONResponse(profile)
+
+@router.put("/update-profile", response_model=UpdateUserResponse)
+async def update_user_profile(update_request: UpdateUserRequest, db: AsyncSession = Depends(get_async_db), current_user_id: int = Depends(verify_access_token_async)):
+    updated_user = await update_user(db, current_user_id, update_request.model_dump(exclude_unset=True))
+    return {"message": "Profile updated successfully", "user": updated_user}
+
+@router.post("/upload-profile-picture")
+async def upload_profile_picture(file: UploadFile = File(...), current_user_id: int = Depends(verify_access_token_async), db: AsyncSession = Depends(get_async_db)):
+    profile_picture_url = await upload_user_profile_picture(file, current_user_id, db)
+    return JSONResponse(content={"message": "Profile picture uploaded successfully.", "profile_picture_url": profile_picture_url})
+
+@router.post("/change-password")
+async def change_password(change_password_request: ChangePasswordRequest, db: AsyncSession = Depends(get_async_db), current_user_id: int = Depends(verify_access_token_async)):
+    await change_user_password(db, current_user_id, change_password_request.old_password, change_password_request.new_password)
+    return {"message": "Password changed successfully"}
+
+@router.delete("/delete-account")
+async def delete_account(db: AsyncSession = Depends(get_async_db), current_user_id: int = Depends(verify_access_token_async)):
+    await delete_user(db, current_user_id)
+    return {"message": "Account deleted successfully"}
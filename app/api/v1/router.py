@@ -1,6 +1,15 @@
-from fastapi import APIRouter
-from app.api.v1.endpoints import users
+from fastapi import APIRouter, Depends
+from app.api.v1.endpoints import users, users_async, friends, friend_requests, posts, feed, metrics
+from app.core.config import settings
+from app.utils.helper import verify_metrics_token
 
 api_router = APIRouter()
 
-api_router.include_router(users.router, prefix="/user", tags=["users"])
+# Same routes either way; the async set runs on the event loop with an AsyncSession
+api_router.include_router(users_async.router if settings.DATABASE_ASYNC else users.router, prefix="/user", tags=["users"])
+# Friends endpoints use the sync session in both modes
+api_router.include_router(friends.router, prefix="/friends", tags=["friends"])
+api_router.include_router(friend_requests.router, prefix="/friend-requests", tags=["friends"])
+api_router.include_router(posts.router, prefix="/posts", tags=["posts"])
+api_router.include_router(feed.router, prefix="/feed", tags=["posts"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"], dependencies=[Depends(verify_metrics_token)])
@@ -0,0 +1,62 @@
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+# Stand-in for GET_LOCK on databases without named locks (sqlite in local runs), which only
+# ever have one process
+_local_locks = defaultdict(threading.Lock)
+_local_locks_lock = threading.Lock()
+
+def _local_lock(name: str) -> threading.Lock:
+    with _local_locks_lock:
+        return _local_locks[name]
+
+@contextmanager
+def advisory_lock(engine, name: str, timeout: float):
+    """
+    Hold the MySQL named lock `name` (at most 64 characters) for the block, waiting up to
+    timeout seconds for it; yields whether it was acquired.
+
+    The lock lives on its own connection, because a Session hands its connection back to the
+    pool on commit and GET_LOCK belongs to the connection that took it.
+    """
+    if engine.dialect.name != "mysql":
+        lock = _local_lock(name)
+        acquired = lock.acquire(timeout=timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    with engine.connect() as connection:
+        acquired = connection.scalar(text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": timeout}) == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
+
+@asynccontextmanager
+async def advisory_lock_async(async_engine, name: str, timeout: float):
+    """advisory_lock on an async engine."""
+    if async_engine.dialect.name != "mysql":
+        lock = _local_lock(name)
+        acquired = await run_in_threadpool(lock.acquire, timeout=timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+        return
+
+    async with async_engine.connect() as connection:
+        acquired = await connection.scalar(text("SELECT GET_LOCK(:name, :timeout)"), {"name": name, "timeout": timeout}) == 1
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": name})
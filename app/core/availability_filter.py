@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import threading
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.mysql_connection import SessionLocal
+from app.models import User
+from app.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+def normalize(value: str) -> str:
+    # Matches MySQL's case-insensitive collation on the unique indexes
+    return value.strip().lower()
+
+class AvailabilityFilter:
+    """
+    Bloom filter of every username and email in the users table, including deleted rows.
+
+    A negative answer means no row has the value, so it is available without a query. A
+    positive answer only means "maybe taken" and is confirmed against MySQL.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._last_synced_id = 0
+        self._ready = False
+        self._lock = threading.Lock()
+        self.counters = {
+            "checks": 0,
+            "bloom_negatives": 0,
+            "db_lookups": 0,
+            "false_positives": 0,
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def add(self, username: str, email: str):
+        self._bloom.add(f"u:{normalize(username)}")
+        self._bloom.add(f"e:{normalize(email)}")
+
+    def _bloom_check(self, field: str, value: str) -> bool:
+        self._count("checks")
+        key = f"{field[0]}:{normalize(value)}"
+        if self._ready and key not in self._bloom:
+            self._count("bloom_negatives")
+            return False
+        self._count("db_lookups")
+        return True
+
+    def _taken_query(self, field: str, value: str):
+        column = getattr(User, field)
+        return select(User.id).filter(column == normalize(value), User.is_deleted == False).limit(1)
+
+    def _record(self, taken: bool) -> bool:
+        if not taken and self._ready:
+            self._count("false_positives")
+        return taken
+
+    def is_taken(self, db: Session, field: str, value: str) -> bool:
+        if not self._bloom_check(field, value):
+            return False
+        return self._record(db.execute(self._taken_query(field, value)).first() is not None)
+
+    async def is_taken_async(self, db: AsyncSession, field: str, value: str) -> bool:
+        if not self._bloom_check(field, value):
+            return False
+        return self._record((await db.execute(self._taken_query(field, value))).first() is not None)
+
+    def sync(self, db: Session) -> int:
+        """Stream users created since the last sync into the filter."""
+        # Re-scan below the mark, so a signup committed after a higher id was synced still lands
+        last_synced_id = self._last_synced_id
+        rows = db.execute(
+            select(User.id, User.username, User.email)
+            .filter(User.id > last_synced_id - settings.SYNC_ID_OVERLAP)
+            .order_by(User.id)
+            .execution_options(yield_per=1000)
+        )
+        added = 0
+        for user_id, username, email in rows:
+            self.add(username, email)
+            if user_id > last_synced_id:
+                self._last_synced_id = user_id
+                added += 1
+        self._ready = True
+        return added
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["db_lookups"]
+        return {
+            **counters,
+            "ready": self._ready,
+            "last_synced_id": self._last_synced_id,
+            "observed_false_positive_rate": counters["false_positives"] / lookups if lookups else 0.0,
+            "bloom": self._bloom.stats(),
+        }
+
+availability_filter = AvailabilityFilter(
+    capacity=settings.AVAILABILITY_BLOOM_CAPACITY,
+    error_rate=settings.AVAILABILITY_BLOOM_ERROR_RATE,
+)
+
+def _sync_once():
+    db = SessionLocal()
+    try:
+        return availability_filter.sync(db)
+    finally:
+        db.close()
+
+async def run_availability_sync(interval: float = settings.AVAILABILITY_SYNC_INTERVAL):
+    # Background task started from the app lifespan; the first pass is the startup load
+    while True:
+        try:
+            await run_in_threadpool(_sync_once)
+        except Exception:
+            logger.exception("Username/email availability sync failed")
+        await asyncio.sleep(interval)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "CoTravels"
@@ -20,12 +20,134 @@ class Settings(BaseSettings):
     MYSQL_HOST: str
     MYSQL_DB: str
 
+    # Connection pool settings, applied per engine and per worker process.
+    # Recycle below MySQL's wait_timeout so idle connections aren't dropped under us.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Read replicas for read-only endpoints, and how long a user reads from the primary after writing
+    MYSQL_REPLICA_URLS: List[str] = []
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Serve the user endpoints from an AsyncSession on the event loop instead of the threadpool
+    DATABASE_ASYNC: bool = False
+
     # MongoDB settings
     MONGODB_URI: str
     MONGODB_DB: str
 
     # JWT settings
     JWT_SECRET: str
+    ACCESS_TOKEN_EXPIRY_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRY_MINUTES: int = 1440
+
+    # Bearer token for /metrics and /api/metrics/*; both answer 404 while it is unset
+    METRICS_TOKEN: Optional[str] = None
+
+    # User profile cache: in-process tier, plus an optional shared tier ("local" stand-in or a redis:// URL)
+    PROFILE_CACHE_SIZE: int = 10000
+    PROFILE_CACHE_TTL: float = 30
+    PROFILE_CACHE_SHARED_URL: Optional[str] = None
+    PROFILE_CACHE_SHARED_TTL: float = 300
+
+    # Username/email availability filter (two entries per user)
+    AVAILABILITY_BLOOM_CAPACITY: int = 2000000
+    AVAILABILITY_BLOOM_ERROR_RATE: float = 0.01
+    AVAILABILITY_SYNC_INTERVAL: float = 30
+
+    # Tables synced into in-process structures by auto-increment id re-scan this many ids below
+    # their high-water mark, since ids are allocated at insert but rows only appear at commit
+    SYNC_ID_OVERLAP: int = 1000
+
+    # Token revocation cache settings
+    REVOCATION_CACHE_SIZE: int = 10000
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_INTERVAL: float = 5.0
+
+    # Password hashing settings
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 16
+
+    # Batch jwt_sessions audit inserts across requests instead of writing them inline
+    SESSION_WRITE_BEHIND: bool = False
+    SESSION_WRITE_BEHIND_INTERVAL_MS: int = 5
+    SESSION_WRITE_BEHIND_MAX_BATCH: int = 500
+    SESSION_WRITE_BEHIND_MAX_PENDING: int = 10000
+
+    # Expired session/token row cleanup
+    REAPER_ENABLED: bool = True
+    REAPER_INTERVAL_SECONDS: float = 3600
+    REAPER_RETENTION_HOURS: float = 24
+    REAPER_CHUNK_SIZE: int = 500
+    REAPER_SLEEP_FACTOR: float = 1.0
+    # Seconds_Behind_Source on any replica above which the reaper pauses between chunks
+    REAPER_MAX_REPLICATION_LAG: float = 5.0
+
+    # Profile picture uploads
+    PROFILE_PICTURE_MAX_BYTES: int = 5 * 1024 * 1024
+    PROFILE_PICTURE_CHUNK_SIZE: int = 64 * 1024
+    PROFILE_PICTURE_SIZES: List[int] = [64, 128, 256]
+    PROFILE_PICTURE_WORKERS: int = 1
+    PROFILE_PICTURE_MAX_PENDING: int = 100
+    # Seconds an upload waits for another upload or cleanup of the same image
+    PROFILE_PICTURE_LOCK_TIMEOUT: float = 10
+
+    # Static file serving
+    STATIC_MAX_AGE: int = 3600
+    STATIC_IMMUTABLE_MAX_AGE: int = 31536000
+    STATIC_MEMORY_CACHE_MAX_FILE_SIZE: int = 1024 * 1024
+    STATIC_MEMORY_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+
+    # Logging; LOG_DIR is relative to the working directory
+    LOG_DIR: str = "logs"
+    LOG_LEVEL: str = "ERROR"
+    LOG_RETENTION_DAYS: int = 14
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_STORM_WINDOW_SECONDS: float = 60
+    LOG_STORM_BURST: int = 20
+    LOG_STORM_SAMPLE_EVERY: int = 100
+
+    # Debugging aid: echo the submitted JSON body, sensitive fields masked, in 422 responses
+    VALIDATION_ERRORS_ECHO_BODY: bool = False
+
+    # Slow query log and N+1 detection; QUERY_INSPECTOR_MODE is off, sample or dev
+    SLOW_QUERY_THRESHOLD_MS: float = 200
+    QUERY_INSPECTOR_MODE: str = "sample"
+    QUERY_INSPECTOR_SAMPLE_RATE: float = 0.01
+    N_PLUS_ONE_THRESHOLD: int = 10
+    N_PLUS_ONE_RAISE: bool = False
+
+    # Friends list pages and friend request batches
+    FRIENDS_PAGE_SIZE: int = 20
+    FRIENDS_MAX_PAGE_SIZE: int = 100
+    FRIEND_REQUEST_BATCH_MAX: int = 100
+
+    # In-memory friend graph for mutual friends and suggestions
+    FRIEND_GRAPH_SYNC_INTERVAL: float = 5.0
+    # Overlay edges that trigger a rebuild of the arrays
+    FRIEND_GRAPH_MAX_DELTA: int = 100000
+    FRIEND_GRAPH_MAX_FANOUT: int = 1000
+
+    # Home feed: posts are pushed into capped per-user MongoDB feeds, except for authors with at
+    # least FEED_FANOUT_MAX_FRIENDS friends, whose posts are pulled in when a feed is read
+    FEED_MAX_LENGTH: int = 500
+    FEED_FANOUT_MAX_FRIENDS: int = 5000
+    FEED_PAGE_SIZE: int = 20
+    FEED_MAX_PAGE_SIZE: int = 50
+    FEED_WRITER_INTERVAL_MS: int = 50
+    FEED_WRITER_MAX_BATCH: int = 5000
+    FEED_WRITER_MAX_PENDING: int = 200000
+
+    # Profile and trip post listings
+    POSTS_PAGE_SIZE: int = 20
+    POSTS_MAX_PAGE_SIZE: int = 50
+    # Longest trip a post may describe; bounds how far back a trip-window listing has to look
+    POSTS_MAX_TRIP_DAYS: int = 90
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,91 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+class PoolStats:
+    """Counters for one connection pool, fed by the instrumented pool classes and pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            "checkouts": 0,
+            "checkout_timeouts": 0,
+            "checkout_wait_seconds_total": 0.0,
+            "checkout_wait_seconds_max": 0.0,
+            "connects": 0,
+            "invalidations": 0,
+            "soft_invalidations": 0,
+        }
+
+    def record_checkout(self, wait_seconds: float):
+        with self._lock:
+            self.counters["checkouts"] += 1
+            self.counters["checkout_wait_seconds_total"] += wait_seconds
+            self.counters["checkout_wait_seconds_max"] = max(self.counters["checkout_wait_seconds_max"], wait_seconds)
+
+    def increment(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counters)
+
+class _TimedCheckoutMixin:
+    # _do_get is where QueuePool blocks waiting for a free connection, so time it there
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.increment("checkout_timeouts")
+            raise
+        self.stats.record_checkout(time.perf_counter() - started_at)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+def instrument_engine(engine):
+    """Attach invalidation/connect listeners to an engine built with an instrumented pool."""
+    stats = getattr(engine.pool, "stats", None)
+    if stats is None:
+        return engine
+
+    event.listen(engine, "connect", lambda *args: stats.increment("connects"))
+    event.listen(engine, "invalidate", lambda *args: stats.increment("invalidations"))
+    event.listen(engine, "soft_invalidate", lambda *args: stats.increment("soft_invalidations"))
+    return engine
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow_in_use": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        counters = stats.snapshot()
+        checkouts = counters["checkouts"]
+        counters["checkout_wait_seconds_avg"] = counters["checkout_wait_seconds_total"] / checkouts if checkouts else 0.0
+        status.update(counters)
+    return status
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.core.mongodb_connection import db as mongo_db
+
+logger = logging.getLogger(__name__)
+
+class FeedWriter:
+    """
+    Write-behind buffer for fan-out on write.
+
+    Creating a post only appends (recipient, item) entries here; a background task flushes
+    them every few milliseconds as one unordered bulk_write with a single upsert per
+    recipient. Each upsert pushes that recipient's new items into their feed document,
+    keeps it sorted newest first and trims it to max_length, so a feed never grows past
+    the cap however many friends post.
+    """
+
+    def __init__(self, collection, max_length: int, interval_ms: int, max_batch: int, max_pending: int):
+        self.collection = collection
+        self.max_length = max_length
+        self.interval = interval_ms / 1000
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._pending = []
+        self._lock = threading.Lock()
+        self.counters = {
+            "enqueued": 0,
+            "written": 0,
+            "flushes": 0,
+            "dropped": 0,
+        }
+
+    def enqueue(self, recipient_ids: list, item: dict):
+        with self._lock:
+            room = self.max_pending - len(self._pending)
+            if room < len(recipient_ids):
+                self.counters["dropped"] += len(recipient_ids) - max(room, 0)
+                recipient_ids = recipient_ids[:max(room, 0)]
+            self._pending.extend((recipient_id, item) for recipient_id in recipient_ids)
+            self.counters["enqueued"] += len(recipient_ids)
+
+    def _group(self, batch: list) -> dict:
+        items_by_recipient = defaultdict(list)
+        for recipient_id, item in batch:
+            items_by_recipient[recipient_id].append(item)
+        return items_by_recipient
+
+    def _operation(self, recipient_id: int, items: list) -> UpdateOne:
+        return UpdateOne(
+            {"_id": recipient_id},
+            {"$push": {"items": {"$each": items, "$sort": {"post_id": -1}, "$slice": self.max_length}}},
+            upsert=True,
+        )
+
+    def _requeue(self, entries: list):
+        # Back to the front of the queue for the next tick, as long as there is room
+        with self._lock:
+            room = max(self.max_pending - len(self._pending), 0)
+            self._pending[:0] = entries[:room]
+            self.counters["dropped"] += len(entries) - min(room, len(entries))
+
+    async def flush(self) -> int:
+        """Write up to max_batch buffered entries. Returns the number written."""
+        with self._lock:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+        if not batch:
+            return 0
+
+        grouped = list(self._group(batch).items())
+        try:
+            await self.collection.bulk_write([self._operation(*group) for group in grouped], ordered=False)
+        except BulkWriteError as error:
+            # Unordered, so every upsert but the failed ones went through. Retrying only those
+            # keeps the others from being pushed twice; $push is not idempotent, and while the
+            # feed read drops repeats, they take up room in the capped feed
+            failed = [grouped[write_error["index"]] for write_error in error.details.get("writeErrors", [])]
+            self._requeue([(recipient_id, item) for recipient_id, items in failed for item in items])
+            with self._lock:
+                self.counters["written"] += len(batch) - sum(len(items) for _, items in failed)
+            raise
+        except Exception:
+            self._requeue(batch)
+            raise
+
+        with self._lock:
+            self.counters["written"] += len(batch)
+            self.counters["flushes"] += 1
+        return len(batch)
+
+    async def flush_all(self):
+        while await self.flush():
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "pending": len(self._pending)}
+
+feed_writer = FeedWriter(
+    mongo_db["feeds"],
+    max_length=settings.FEED_MAX_LENGTH,
+    interval_ms=settings.FEED_WRITER_INTERVAL_MS,
+    max_batch=settings.FEED_WRITER_MAX_BATCH,
+    max_pending=settings.FEED_WRITER_MAX_PENDING,
+)
+
+async def run_feed_writer():
+    # Background task started from the app lifespan
+    try:
+        while True:
+            await asyncio.sleep(feed_writer.interval)
+            try:
+                await feed_writer.flush()
+            except Exception:
+                logger.exception("Flushing feed fan-out failed")
+    finally:
+        # Drain whatever is left on shutdown
+        try:
+            await feed_writer.flush_all()
+        except Exception:
+            logger.exception("Draining feed fan-out failed")
@@ -0,0 +1,218 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.mysql_connection import SessionLocal
+from app.models import Friend
+
+logger = logging.getLogger(__name__)
+
+EMPTY = array("i")
+
+class FriendGraph:
+    """
+    Every friends edge held in memory in CSR form: one sorted int32 array of neighbours for
+    all users back to back, and an int64 offsets array indexed by user id marking where each
+    user's run starts. A user's friends are one slice, so mutual friend counts and
+    friend-of-friend suggestions never touch MySQL.
+
+    Friendships made since the last full load live in small per-user overlay sets: this
+    worker's own right away, other workers' when the sync picks their rows up by id. Once the
+    overlay grows past max_delta edges the arrays are rebuilt from the friends table. There is
+    no unfriending, so friends rows are only ever inserted and the overlay never has to
+    record a removal.
+    """
+
+    def __init__(self, max_fanout: int, max_delta: int):
+        self.max_fanout = max_fanout
+        self.max_delta = max_delta
+        self._offsets = array("q", [0])
+        self._neighbors = array("i")
+        self._added = {}
+        self._delta_edges = 0
+        self._last_synced_id = 0
+        self._loaded_at = None
+        self._ready = False
+        self._lock = threading.Lock()
+        self.counters = {"mutual_queries": 0, "suggestion_queries": 0, "reloads": 0, "synced_edges": 0}
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def _base(self, user_id: int) -> array:
+        if user_id + 1 >= len(self._offsets):
+            return EMPTY
+        return self._neighbors[self._offsets[user_id]:self._offsets[user_id + 1]]
+
+    def _friends(self, user_id: int):
+        # Caller holds the lock. The plain slice is returned when there is no overlay for the user
+        base = self._base(user_id)
+        added = self._added.get(user_id)
+        if not added:
+            return base
+        return sorted(added.union(base))
+
+    def _degree(self, user_id: int) -> int:
+        # The overlay only ever holds edges the base lacks
+        base = self._offsets[user_id + 1] - self._offsets[user_id] if user_id + 1 < len(self._offsets) else 0
+        return base + len(self._added.get(user_id, ()))
+
+    def friends_of(self, user_id: int) -> list:
+        with self._lock:
+            return list(self._friends(user_id))
+
+    def high_degree_friends(self, user_id: int, min_degree: int) -> list:
+        """The user's friends who have at least min_degree friends themselves."""
+        with self._lock:
+            return [friend_id for friend_id in self._friends(user_id) if self._degree(friend_id) >= min_degree]
+
+    def mutual_friends_count(self, user_id: int, other_id: int) -> int:
+        with self._lock:
+            self.counters["mutual_queries"] += 1
+            return len(set(self._friends(user_id)).intersection(self._friends(other_id)))
+
+    def suggestions(self, user_id: int, limit: int) -> list:
+        """
+        (user_id, mutual friend count) of the friends-of-friends the user isn't friends with,
+        most mutual friends first. Only the first max_fanout friends are expanded, which
+        bounds the cost for very well-connected users.
+        """
+        with self._lock:
+            self.counters["suggestion_queries"] += 1
+            friends = self._friends(user_id)
+            mutual = Counter()
+            for friend_id in friends[:self.max_fanout]:
+                mutual.update(self._friends(friend_id))
+        mutual.pop(user_id, None)
+        for friend_id in friends:
+            mutual.pop(friend_id, None)
+        # Ties go to the lower (older) user id so results are stable
+        return heapq.nsmallest(limit, mutual.items(), key=lambda item: (-item[1], item[0]))
+
+    def _in_base(self, user_id: int, friend_id: int) -> bool:
+        if user_id + 1 >= len(self._offsets):
+            return False
+        start, end = self._offsets[user_id], self._offsets[user_id + 1]
+        index = bisect_left(self._neighbors, friend_id, start, end)
+        return index < end and self._neighbors[index] == friend_id
+
+    def _apply(self, user_id: int, friend_id: int):
+        # Caller holds the lock; records one direction of an edge in the overlay
+        if not self._in_base(user_id, friend_id) and friend_id not in self._added.get(user_id, ()):
+            self._added.setdefault(user_id, set()).add(friend_id)
+            self._delta_edges += 1
+
+    def add_friendship(self, user_id: int, friend_id: int):
+        """Call after the friends rows are committed, so this worker answers from them right away."""
+        with self._lock:
+            self._apply(user_id, friend_id)
+            self._apply(friend_id, user_id)
+
+    def load(self, db: Session) -> int:
+        """Rebuild the CSR arrays from the friends table, streamed in (user_id, friend_id) order."""
+        offsets = array("q", [0])
+        neighbors = array("i")
+        last_id = 0
+        # Executed on the connection: ORM result processing would triple the load time
+        rows = db.connection().execute(
+            select(Friend.user_id, Friend.friend_id, Friend.id)
+            .order_by(Friend.user_id, Friend.friend_id)
+            .execution_options(yield_per=10000)
+        )
+        current_user = 0
+        for user_id, friend_id, row_id in rows:
+            if user_id != current_user:
+                # Close the runs of every user up to this one; users without friends get empty runs
+                offsets.extend([len(neighbors)] * (user_id - current_user))
+                current_user = user_id
+            neighbors.append(friend_id)
+            if row_id > last_id:
+                last_id = row_id
+        offsets.append(len(neighbors))
+
+        with self._lock:
+            self._offsets, self._neighbors = offsets, neighbors
+            # Keep only the overlay the new arrays don't already reflect, e.g. a friendship
+            # committed after the load query started
+            for user_id in list(self._added):
+                self._added[user_id] = {friend_id for friend_id in self._added[user_id] if not self._in_base(user_id, friend_id)}
+                if not self._added[user_id]:
+                    del self._added[user_id]
+            self._delta_edges = sum(map(len, self._added.values()))
+            self._last_synced_id = max(self._last_synced_id, last_id)
+            self._loaded_at = time.monotonic()
+            self._ready = True
+            self.counters["reloads"] += 1
+        return len(neighbors)
+
+    def sync(self, db: Session) -> int:
+        """Add friends rows inserted since the last load or sync, e.g. by other workers."""
+        # Re-scan below the mark, so a friendship committed after a higher id was synced (or
+        # loaded) isn't missed until the next full load; _apply ignores edges it already has
+        last_synced_id = self._last_synced_id
+        rows = db.execute(
+            select(Friend.id, Friend.user_id, Friend.friend_id)
+            .filter(Friend.id > last_synced_id - settings.SYNC_ID_OVERLAP)
+            .order_by(Friend.id)
+            .execution_options(yield_per=1000)
+        ).all()
+        added = 0
+        with self._lock:
+            for row_id, user_id, friend_id in rows:
+                self._apply(user_id, friend_id)
+                if row_id > self._last_synced_id:
+                    self._last_synced_id = row_id
+                    added += 1
+            self.counters["synced_edges"] += added
+        return added
+
+    def needs_reload(self) -> bool:
+        return not self._ready or self._delta_edges > self.max_delta
+
+    def stats(self) -> dict:
+        with self._lock:
+            edges = len(self._neighbors)
+            array_bytes = self._offsets.itemsize * len(self._offsets) + self._neighbors.itemsize * edges
+            return {
+                **self.counters,
+                "ready": self._ready,
+                "user_id_slots": len(self._offsets) - 1,
+                "edges": edges,
+                "delta_edges": self._delta_edges,
+                "last_synced_id": self._last_synced_id,
+                "array_bytes": array_bytes,
+                "bytes_per_million_edges": round(array_bytes / edges * 1e6) if edges else 0,
+                "seconds_since_load": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+            }
+
+friend_graph = FriendGraph(
+    max_fanout=settings.FRIEND_GRAPH_MAX_FANOUT,
+    max_delta=settings.FRIEND_GRAPH_MAX_DELTA,
+)
+
+def _sync_once():
+    db = SessionLocal()
+    try:
+        if friend_graph.needs_reload():
+            return friend_graph.load(db)
+        return friend_graph.sync(db)
+    finally:
+        db.close()
+
+async def run_friend_graph_sync(interval: float = settings.FRIEND_GRAPH_SYNC_INTERVAL):
+    # Background task started from the app lifespan; the first pass is the startup load
+    while True:
+        try:
+            await run_in_threadpool(_sync_once)
+        except Exception:
+            logger.exception("Friend graph sync failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,278 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import BinaryIO, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Leading bytes of the image formats we accept, mapped to the extension they are stored with
+IMAGE_SIGNATURES = [
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+]
+
+SAVE_OPTIONS = {
+    "jpg": dict(format="JPEG", quality=85, optimize=True, progressive=True),
+    "png": dict(format="PNG", optimize=True),
+    "gif": dict(format="GIF"),
+    "webp": dict(format="WEBP", quality=80),
+}
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Extension for the image format the bytes start with, or None if it is not one we accept."""
+    for signature, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+def variant_name(file_name: str, size: int) -> str:
+    stem, extension = file_name.rsplit(".", 1)
+    return f"{stem}_{size}.{extension}"
+
+# Worker function runs in the pool processes, so it must stay importable at module level
+def _make_variants(directory: str, file_name: str, sizes: List[int]):
+    started_at = time.time()
+    extension = file_name.rsplit(".", 1)[1]
+    options = SAVE_OPTIONS[extension]
+    with Image.open(os.path.join(directory, file_name)) as original:
+        image = ImageOps.exif_transpose(original)
+        if extension == "jpg" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        for size in sizes:
+            path = os.path.join(directory, variant_name(file_name, size))
+            if os.path.exists(path):
+                continue
+            # Square centre crop, which is how avatars are displayed
+            variant = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            temp_path = os.path.join(directory, f".{variant_name(file_name, size)}.part")
+            variant.save(temp_path, **options)
+            os.replace(temp_path, path)
+    return time.time() - started_at
+
+class UploadTooLarge(Exception):
+    pass
+
+class InvalidImage(Exception):
+    pass
+
+class ImageStore:
+    """
+    Content-addressed store for uploaded images, named by the SHA-256 of their bytes.
+
+    Uploads are copied off the event loop, chunk by chunk, into a hidden temporary file that
+    is renamed into place once complete; an upload whose hash is already stored is dropped
+    and the existing file reused. Placing an image and deleting one both happen under its
+    lock_name(), since one stored file can be shared by several users. Square variants for each configured size are generated once
+    per stored image in a process pool, off the request path, and resolve() falls back to the
+    original until they exist.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, chunk_size: int, sizes: List[int], workers: int, max_pending: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.sizes = sorted(sizes)
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.counters = {
+            "uploads": 0,
+            "deduplicated": 0,
+            "rejected_too_large": 0,
+            "rejected_type": 0,
+            "bytes_written": 0,
+            "seconds_writing": 0.0,
+            "variant_jobs": 0,
+            "variant_jobs_failed": 0,
+            "variant_jobs_dropped": 0,
+            "variant_seconds_total": 0.0,
+        }
+
+    def _count(self, name: str, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _copy(self, source: BinaryIO) -> Tuple[str, str]:
+        os.makedirs(self.directory, exist_ok=True)
+        source.seek(0)
+        header = source.read(self.chunk_size)
+        extension = sniff_image_type(header)
+        if extension is None:
+            raise InvalidImage()
+
+        digest = hashlib.sha256()
+        temp_path = os.path.join(self.directory, f".upload-{threading.get_ident()}-{time.monotonic_ns()}.part")
+        written = 0
+        try:
+            with open(temp_path, "wb") as buffer:
+                chunk = header
+                while chunk:
+                    written += len(chunk)
+                    if written > self.max_bytes:
+                        raise UploadTooLarge()
+                    digest.update(chunk)
+                    buffer.write(chunk)
+                    chunk = source.read(self.chunk_size)
+        except BaseException:
+            self.discard(temp_path)
+            raise
+        return f"{digest.hexdigest()}.{extension}", temp_path
+
+    async def stage(self, file: UploadFile) -> Tuple[str, str]:
+        """
+        Copy the upload to a temporary file and hash it. Returns the name it will be stored
+        under and the temporary path, which the caller hands to place() or discard().
+        """
+        # UploadLimitMiddleware already cut off bodies much larger than max_bytes while they were
+        # received; this catches a file just over it before anything is copied
+        if file.size is not None and file.size > self.max_bytes:
+            raise self.too_large()
+
+        started = time.perf_counter()
+        try:
+            staged = await run_in_threadpool(self._copy, file.file)
+        except InvalidImage:
+            self._count("rejected_type")
+            raise HTTPException(status_code=400, detail="Invalid file type. Please upload an image.")
+        except UploadTooLarge:
+            raise self.too_large()
+        self._count("seconds_writing", time.perf_counter() - started)
+        return staged
+
+    def lock_name(self, file_name: str) -> str:
+        """
+        Advisory lock name for a stored image. place() and the row update that points at the
+        image, and the "still referenced?" check with remove_files(), each run under it, so a
+        deduplicated upload cannot lose its file to a concurrent cleanup.
+        """
+        # GET_LOCK names are limited to 64 characters
+        return f"image:{file_name[:48]}"
+
+    def place(self, file_name: str, temp_path: str) -> bool:
+        """Move a staged upload into place under its content hash. Returns whether it was new."""
+        path = os.path.join(self.directory, file_name)
+        created = not os.path.exists(path)
+        if created:
+            written = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        else:
+            written = 0
+            self.discard(temp_path)
+
+        with self._lock:
+            self.counters["uploads"] += 1
+            self.counters["bytes_written"] += written
+            self.counters["deduplicated"] += 0 if created else 1
+
+        # A deduplicated image can be missing variants whose job was dropped or failed
+        if created or not all(os.path.exists(os.path.join(self.directory, variant_name(file_name, size))) for size in self.sizes):
+            self.generate_variants(file_name)
+        return created
+
+    def discard(self, temp_path: str):
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+
+    def generate_variants(self, file_name: str):
+        """Queue the size variants of a stored image; never waits for them."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.counters["variant_jobs_dropped"] += 1
+                return
+            self._pending += 1
+        try:
+            future = self._get_executor().submit(_make_variants, self.directory, file_name, self.sizes)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(lambda done: self._record_variants(file_name, done))
+
+    def _record_variants(self, file_name: str, future: Future):
+        with self._lock:
+            self._pending -= 1
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self._count("variant_jobs_failed")
+            logger.error("Generating variants of %s failed: %r", file_name, future.exception())
+            return
+        with self._lock:
+            self.counters["variant_jobs"] += 1
+            self.counters["variant_seconds_total"] += future.result()
+
+    def resolve(self, file_name: str, display_size: int) -> str:
+        """Smallest variant covering display_size pixels, or the original if there is none yet."""
+        size = next((size for size in self.sizes if size >= display_size), None)
+        if size is None:
+            return file_name
+        variant = variant_name(file_name, size)
+        return variant if os.path.exists(os.path.join(self.directory, variant)) else file_name
+
+    def remove_files(self, file_name: str):
+        for name in [file_name, *(variant_name(file_name, size) for size in self.sizes)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    async def remove(self, file_name: str):
+        """Delete an image and its variants. Callers check that no other user still refers to it."""
+        await run_in_threadpool(self.remove_files, file_name)
+
+    def too_large(self) -> HTTPException:
+        """Count an oversized upload and build the 413 it is refused with."""
+        self._count("rejected_too_large")
+        return HTTPException(status_code=413, detail=f"Image must not exceed {self.max_bytes // 1024} KB")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            pending = self._pending
+        seconds = counters["seconds_writing"]
+        stored = counters["uploads"] - counters["deduplicated"]
+        return {
+            **counters,
+            "average_bytes": counters["bytes_written"] / stored if stored else 0,
+            "throughput_bytes_per_second": counters["bytes_written"] / seconds if seconds else 0.0,
+            "variant_seconds_avg": counters["variant_seconds_total"] / counters["variant_jobs"] if counters["variant_jobs"] else 0.0,
+            "variant_jobs_pending": pending,
+            "variant_sizes": self.sizes,
+            "max_bytes": self.max_bytes,
+        }
+
+profile_picture_store = ImageStore(
+    directory="static/profile_pictures",
+    max_bytes=settings.PROFILE_PICTURE_MAX_BYTES,
+    chunk_size=settings.PROFILE_PICTURE_CHUNK_SIZE,
+    sizes=settings.PROFILE_PICTURE_SIZES,
+    workers=settings.PROFILE_PICTURE_WORKERS,
+    max_pending=settings.PROFILE_PICTURE_MAX_PENDING,
+)
@@ -1,11 +1,14 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config import settings
+from app.core.request_metrics import MongoCommandMetrics
 import os
 
-# Environment variables for MongoDB credentials
-MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-MONGODB_DB = os.getenv("MONGODB_DB")
+# Environment variables for MongoDB credentials, falling back to .env through settings
+MONGODB_URI = os.getenv("MONGODB_URI", settings.MONGODB_URI)
+MONGODB_DB = os.getenv("MONGODB_DB", settings.MONGODB_DB)
 
-client = AsyncIOMotorClient(MONGODB_URI)
+# Command timings are exported on /metrics
+client = AsyncIOMotorClient(MONGODB_URI, event_listeners=[MongoCommandMetrics()])
 db = client[MONGODB_DB]
 
 # Dependency
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, Future
+from fastapi import HTTPException, status
+from app.core.config import settings
+import bcrypt
+
+# Worker functions run in the pool processes, so they must stay importable at module level
+def _hash_password(password: str, rounds: int, submitted_at: float):
+    started_at = time.time()
+    hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+    return hashed, started_at - submitted_at, time.time() - started_at
+
+def _check_password(password: str, hashed_password: str, submitted_at: float):
+    started_at = time.time()
+    matches = bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    return matches, started_at - submitted_at, time.time() - started_at
+
+def hash_rounds(hashed_password: str) -> int:
+    """Read the cost factor out of a "$2b$12$..." bcrypt hash."""
+    return int(hashed_password.split('$')[2])
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so password work can't exhaust the threadpool
+    shared with the other endpoints. At most workers + queue_size jobs are admitted at once;
+    anything beyond that is rejected with a 503 instead of waiting.
+    """
+
+    def __init__(self, workers: int, queue_size: int, rounds: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.rounds = rounds
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.counters = {
+            "completed": 0,
+            "rejected": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "hash_seconds_total": 0.0,
+            "hash_seconds_max": 0.0,
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _submit(self, fn, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.counters["rejected"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly.",
+            )
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(fn, *args, time.time())
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._record)
+        return future
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _record(self, future: Future):
+        self._release()
+        if future.cancelled() or future.exception() is not None:
+            return
+        _, wait_seconds, hash_seconds = future.result()
+        with self._lock:
+            self.counters["completed"] += 1
+            self.counters["wait_seconds_total"] += wait_seconds
+            self.counters["wait_seconds_max"] = max(self.counters["wait_seconds_max"], wait_seconds)
+            self.counters["hash_seconds_total"] += hash_seconds
+            self.counters["hash_seconds_max"] = max(self.counters["hash_seconds_max"], hash_seconds)
+
+    def hash(self, password: str) -> str:
+        return self._submit(_hash_password, password, self.rounds).result()[0]
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return self._submit(_check_password, password, hashed_password).result()[0]
+
+    async def hash_async(self, password: str) -> str:
+        return (await asyncio.wrap_future(self._submit(_hash_password, password, self.rounds)))[0]
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        return (await asyncio.wrap_future(self._submit(_check_password, password, hashed_password)))[0]
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return hash_rounds(hashed_password) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            in_flight = self._in_flight
+        completed = counters["completed"]
+        return {
+            **counters,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "rounds": self.rounds,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.workers),
+            "wait_seconds_avg": counters["wait_seconds_total"] / completed if completed else 0.0,
+            "hash_seconds_avg": counters["hash_seconds_total"] / completed if completed else 0.0,
+        }
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    rounds=settings.BCRYPT_ROUNDS,
+)
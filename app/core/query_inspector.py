@@ -0,0 +1,146 @@
+import contextvars
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.config import settings
+
+logger = logging.getLogger("app.sql")
+# Warnings from here must get through even though the root logger only passes errors
+logger.setLevel(logging.WARNING)
+
+WHITESPACE = re.compile(r"\s+")
+NUMBER = re.compile(r"\b\d+\b")
+PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)")
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace, numbers and IN lists collapsed, so repeats compare equal."""
+    shape = WHITESPACE.sub(" ", statement).strip()
+    shape = PLACEHOLDER_LIST.sub("(?)", shape)
+    return NUMBER.sub("N", shape)
+
+def redacted(parameters, executemany: bool) -> str:
+    if executemany:
+        return f"<{len(parameters)} parameter sets redacted>"
+    return f"<{len(parameters) if parameters else 0} values redacted>"
+
+class NPlusOneDetected(Exception):
+    pass
+
+class QueryScope:
+    """Counts the statement shapes run inside one request or inspect_queries() block."""
+
+    def __init__(self, label: str, threshold: int, raise_on_repeat: bool):
+        self.label = label
+        self.threshold = threshold
+        self.raise_on_repeat = raise_on_repeat
+        self.counts = Counter()
+        # Which lazy relationship load issued a shape, when the ORM told us
+        self.origins = {}
+        self._pending_origin = None
+
+    def record(self, statement: str):
+        shape = statement_shape(statement)
+        self.counts[shape] += 1
+        if self._pending_origin is not None:
+            self.origins.setdefault(shape, self._pending_origin)
+            self._pending_origin = None
+        if self.raise_on_repeat and self.counts[shape] == self.threshold + 1:
+            raise NPlusOneDetected(self._describe(shape, self.counts[shape]))
+
+    def repeated(self) -> dict:
+        return {shape: count for shape, count in self.counts.items() if count > self.threshold}
+
+    def _describe(self, shape: str, count: int) -> str:
+        origin = self.origins.get(shape)
+        via = f" (lazy load of {origin})" if origin else ""
+        return f"{self.label} ran the same statement {count} times{via}: {shape}"
+
+    def report(self):
+        for shape, count in self.repeated().items():
+            logger.warning("Possible N+1: %s", self._describe(shape, count))
+
+current_scope = contextvars.ContextVar("query_inspector_scope", default=None)
+
+@contextmanager
+def inspect_queries(label: str = "block", threshold: int = None, raise_on_repeat: bool = None):
+    """
+    Track statement shapes for the duration of the block. With raise_on_repeat the statement
+    that pushes a shape past threshold raises NPlusOneDetected, which is how tests fail on N+1.
+    """
+    scope = QueryScope(
+        label,
+        settings.N_PLUS_ONE_THRESHOLD if threshold is None else threshold,
+        settings.N_PLUS_ONE_RAISE if raise_on_repeat is None else raise_on_repeat,
+    )
+    token = current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        current_scope.reset(token)
+        scope.report()
+
+def inspect_engine(engine: Engine, slow_threshold_ms: float = None):
+    """Log slow statements on a sync Engine and feed the active QueryScope."""
+    threshold = (settings.SLOW_QUERY_THRESHOLD_MS if slow_threshold_ms is None else slow_threshold_ms) / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        scope = current_scope.get()
+        if scope is not None:
+            scope.record(statement)
+        conn.info.setdefault("inspector_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["inspector_started"].pop()
+        if elapsed >= threshold:
+            logger.warning(
+                "Slow query (%.1f ms): %s parameters=%s",
+                elapsed * 1000, WHITESPACE.sub(" ", statement).strip(), redacted(parameters, executemany),
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("inspector_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    return engine
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_lazy_load(orm_execute_state):
+    # Runs just before the statement reaches the engine, so the next record() picks it up
+    scope = current_scope.get()
+    if scope is not None and orm_execute_state.is_relationship_load:
+        scope._pending_origin = str(orm_execute_state.loader_strategy_path)
+
+class QueryInspectorMiddleware:
+    """
+    Opens a QueryScope per inspected request: all of them with QUERY_INSPECTOR_MODE=dev, a
+    QUERY_INSPECTOR_SAMPLE_RATE fraction with "sample", none with "off". Slow query logging
+    does not depend on the mode.
+    """
+
+    def __init__(self, app: ASGIApp, mode: str = None, sample_rate: float = None):
+        self.app = app
+        self.mode = settings.QUERY_INSPECTOR_MODE if mode is None else mode
+        self.sample_rate = settings.QUERY_INSPECTOR_SAMPLE_RATE if sample_rate is None else sample_rate
+
+    def _inspected(self) -> bool:
+        if self.mode == "dev":
+            return True
+        return self.mode == "sample" and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self._inspected():
+            await self.app(scope, receive, send)
+            return
+        with inspect_queries(f'{scope["method"]} {scope["path"]}'):
+            await self.app(scope, receive, send)
@@ -0,0 +1,207 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from pymongo import monitoring
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _labels(names: tuple, values: tuple) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, values))
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+
+    def inc(self, *label_values, amount=1):
+        # Called under the registry lock
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self, lines: list, kind: str = "counter"):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} {kind}")
+        for label_values, value in self._values.items():
+            lines.append(f"{self.name}{{{_labels(self.labels, label_values)}}} {value}")
+
+class Gauge(Counter):
+    def render(self, lines: list, kind: str = "gauge"):
+        super().render(lines, kind)
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+
+    def observe(self, value: float, *label_values):
+        # Called under the registry lock; bucket counts are per bucket and summed at render time
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self, lines: list):
+        lines.append(f"# HELP {self.name} {self.help}")
+        lines.append(f"# TYPE {self.name} histogram")
+        for label_values, (counts, total, count) in self._series.items():
+            labels = _labels(self.labels, label_values)
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {count}")
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text format. Updates are a dict lookup and
+    a few additions under one lock, and a scrape only walks the series that exist.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = Counter("http_requests_total", "Requests by route template, method and status.", ("route", "method", "status"))
+        self.in_flight = Gauge("http_requests_in_flight", "Requests currently being handled.", ("route",))
+        self.latency = Histogram("http_request_duration_seconds", "Request latency.", ("route", "method"), LATENCY_BUCKETS)
+        self.request_db_seconds = Histogram("http_request_db_seconds", "Time spent in SQL per request.", ("route",), LATENCY_BUCKETS)
+        self.request_db_statements = Histogram("http_request_db_statements", "SQL statements per request.", ("route",), COUNT_BUCKETS)
+        self.sql_duration = Histogram("db_statement_duration_seconds", "SQL statement latency by database.", ("database",), QUERY_BUCKETS)
+        self.mongo_duration = Histogram("mongo_command_duration_seconds", "MongoDB command latency.", ("command",), QUERY_BUCKETS)
+        self.mongo_failures = Counter("mongo_command_failures_total", "Failed MongoDB commands.", ("command",))
+        self._metrics = [
+            self.requests, self.in_flight, self.latency, self.request_db_seconds,
+            self.request_db_statements, self.sql_duration, self.mongo_duration, self.mongo_failures,
+        ]
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            for metric in self._metrics:
+                metric.render(lines)
+        lines.append("")
+        return "\n".join(lines)
+
+metrics = MetricsRegistry()
+
+# Per-request SQL totals; a dict so the threadpool and greenlet copies of the context share it
+request_db_usage = contextvars.ContextVar("request_db_usage", default=None)
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware recording latency, status and in-flight counts per route template,
+    plus the SQL time and statement count each request caused.
+    """
+
+    def __init__(self, app: ASGIApp, routes: list):
+        self.app = app
+        self.routes = routes
+        self._templates = {}
+
+    def _route_template(self, scope: Scope) -> str:
+        key = (scope["method"], scope["path"])
+        template = self._templates.get(key)
+        if template is None:
+            template = "unmatched"
+            for route in self.routes:
+                match, _ = route.matches(scope)
+                if match != Match.NONE:
+                    template = getattr(route, "path", template)
+                    if match == Match.FULL:
+                        break
+            # Paths with parameters would otherwise grow this without bound
+            if len(self._templates) > 10000:
+                self._templates.clear()
+            self._templates[key] = template
+        return template
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route_template(scope)
+        method = scope["method"]
+        status = 500
+        usage = {"seconds": 0.0, "statements": 0}
+        token = request_db_usage.set(usage)
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with metrics.lock:
+            metrics.in_flight.inc(route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_db_usage.reset(token)
+            with metrics.lock:
+                metrics.in_flight.inc(route, amount=-1)
+                metrics.requests.inc(route, method, status)
+                metrics.latency.observe(elapsed, route, method)
+                metrics.request_db_seconds.observe(usage["seconds"], route)
+                metrics.request_db_statements.observe(usage["statements"], route)
+
+def instrument_sql(engine: Engine, database: str):
+    """Time every statement on a sync Engine (pass async_engine.sync_engine for async ones)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        usage = request_db_usage.get()
+        if usage is not None:
+            usage["seconds"] += elapsed
+            usage["statements"] += 1
+        with metrics.lock:
+            metrics.sql_duration.observe(elapsed, database)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    return engine
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding mongo_command_duration_seconds."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        with metrics.lock:
+            metrics.mongo_duration.observe(event.duration_micros / 1e6, event.command_name)
+
+    def failed(self, event):
+        with metrics.lock:
+            metrics.mongo_duration.observe(event.duration_micros / 1e6, event.command_name)
+            metrics.mongo_failures.inc(event.command_name)
+
+async def prometheus_metrics(request: Request) -> Response:
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
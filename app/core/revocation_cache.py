@@ -0,0 +1,261 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.mysql_connection import SessionLocal, primary_bind
+from app.models import TokenBlacklist, TokenRevocation
+from app.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_SYNC_OVERLAP = timedelta(seconds=30)
+
+class RevocationCache:
+    """
+    Local view of token_blacklist and token_revocations used by verify_access_token.
+
+    A Bloom filter holds every blacklisted token and is kept in sync with the table by a
+    background task, so a "definitely not revoked" answer needs no database round trip.
+    Only "maybe revoked" answers go to MySQL, and their outcome is kept in a small LRU.
+
+    Per-user revocation watermarks (tokens issued before T are revoked) are cached by user id
+    and refreshed by the same background task.
+    """
+
+    def __init__(self, lru_size: int, bloom_capacity: int, bloom_error_rate: float):
+        self.lru_size = lru_size
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._decisions = OrderedDict()
+        self._watermarks = OrderedDict()
+        self._last_synced_id = 0
+        self._watermarks_synced_at = datetime.utcnow()
+        self._ready = False
+        self._lock = threading.Lock()
+        self.counters = {
+            "lru_hits": 0,
+            "lru_misses": 0,
+            "bloom_negatives": 0,
+            "db_lookups": 0,
+            "false_positives": 0,
+            "revoked": 0,
+            "watermark_hits": 0,
+            "watermark_lookups": 0,
+            "watermark_revoked": 0,
+        }
+
+    def _remember(self, token: str, revoked: bool):
+        with self._lock:
+            self._decisions[token] = revoked
+            self._decisions.move_to_end(token)
+            while len(self._decisions) > self.lru_size:
+                self._decisions.popitem(last=False)
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _check_local(self, token: str) -> tuple[bool, bool]:
+        """Answer from the LRU or the filter. Returns (decided, revoked)."""
+        with self._lock:
+            decision = self._decisions.get(token)
+            if decision is not None:
+                self._decisions.move_to_end(token)
+                self.counters["lru_hits"] += 1
+                if decision:
+                    self.counters["revoked"] += 1
+                return True, decision
+            self.counters["lru_misses"] += 1
+
+        # Until the first sync has loaded the table the filter can't prove absence
+        if self._ready and token not in self._bloom:
+            self._count("bloom_negatives")
+            return True, False
+
+        self._count("db_lookups")
+        return False, False
+
+    def _record_lookup(self, token: str, revoked: bool) -> bool:
+        if revoked:
+            self._count("revoked")
+        elif self._ready:
+            self._count("false_positives")
+        self._remember(token, revoked)
+        return revoked
+
+    def is_revoked(self, token: str, db: Session) -> bool:
+        decided, revoked = self._check_local(token)
+        if decided:
+            return revoked
+        # On the primary: the answer is cached, and a "not revoked" read from a lagging replica
+        # would outlive the sync that brought the row into the filter
+        query = select(TokenBlacklist.id).filter_by(token=token).limit(1)
+        revoked = db.execute(query, bind_arguments=primary_bind(db)).first() is not None
+        return self._record_lookup(token, revoked)
+
+    async def is_revoked_async(self, token: str, db: AsyncSession) -> bool:
+        decided, revoked = self._check_local(token)
+        if decided:
+            return revoked
+        result = await db.execute(select(TokenBlacklist.id).filter_by(token=token).limit(1), bind_arguments=primary_bind(db))
+        return self._record_lookup(token, result.first() is not None)
+
+    def mark_revoked(self, token: str):
+        """Record a token blacklisted by this process without waiting for the next sync."""
+        self._bloom.add(token)
+        self._remember(token, True)
+
+    def _remember_watermark(self, user_id: int, watermark: float | None):
+        with self._lock:
+            self._watermarks[user_id] = watermark
+            self._watermarks.move_to_end(user_id)
+            while len(self._watermarks) > self.lru_size:
+                self._watermarks.popitem(last=False)
+
+    def _cached_watermark(self, user_id: int) -> tuple[bool, float | None]:
+        with self._lock:
+            if user_id not in self._watermarks:
+                self.counters["watermark_lookups"] += 1
+                return False, None
+            self._watermarks.move_to_end(user_id)
+            self.counters["watermark_hits"] += 1
+            return True, self._watermarks[user_id]
+
+    def _issued_before(self, issued_at: float, watermark: float | None) -> bool:
+        revoked = watermark is not None and issued_at < watermark
+        if revoked:
+            self._count("watermark_revoked")
+        return revoked
+
+    def is_user_revoked(self, user_id: int, issued_at: float, db: Session) -> bool:
+        """Check a token's issue time against the user's revocation watermark."""
+        cached, watermark = self._cached_watermark(user_id)
+        if not cached:
+            # Cached too, so read from the primary like is_revoked
+            revocation = db.get(TokenRevocation, user_id, bind_arguments=primary_bind(db))
+            watermark = _to_epoch(revocation.revoked_before) if revocation else None
+            self._remember_watermark(user_id, watermark)
+        return self._issued_before(issued_at, watermark)
+
+    async def is_user_revoked_async(self, user_id: int, issued_at: float, db: AsyncSession) -> bool:
+        cached, watermark = self._cached_watermark(user_id)
+        if not cached:
+            # AsyncSession.get() takes no bind_arguments, so select the column instead
+            query = select(TokenRevocation.revoked_before).where(TokenRevocation.user_id == user_id)
+            revoked_before = (await db.execute(query, bind_arguments=primary_bind(db))).scalar()
+            watermark = _to_epoch(revoked_before) if revoked_before else None
+            self._remember_watermark(user_id, watermark)
+        return self._issued_before(issued_at, watermark)
+
+    def set_watermark(self, user_id: int, revoked_before: datetime):
+        """Record a logout-all performed by this process without waiting for the next sync."""
+        self._remember_watermark(user_id, _to_epoch(revoked_before))
+
+    def _sync_watermarks(self, db: Session):
+        # Users are looked up lazily, so only watermarks that moved since the last sync matter
+        started_at = datetime.utcnow()
+        # Overlap the previous window so writes from workers with a slightly skewed clock aren't missed
+        since = self._watermarks_synced_at - WATERMARK_SYNC_OVERLAP
+        rows = (
+            db.query(TokenRevocation.user_id, TokenRevocation.revoked_before)
+            .filter(TokenRevocation.revoked_before >= since)
+            .yield_per(1000)
+        )
+        for user_id, revoked_before in rows:
+            with self._lock:
+                if user_id in self._watermarks:
+                    self._watermarks[user_id] = _to_epoch(revoked_before)
+        self._watermarks_synced_at = started_at
+
+    def sync(self, db: Session) -> int:
+        """Load blacklist rows added since the last sync. Returns the number past the previous mark."""
+        # Re-scan below the mark: a logout whose transaction commits after a higher id was
+        # synced would otherwise never reach the filter
+        last_synced_id = self._last_synced_id
+        rows = (
+            db.query(TokenBlacklist.id, TokenBlacklist.token)
+            .filter(TokenBlacklist.id > last_synced_id - settings.SYNC_ID_OVERLAP)
+            .order_by(TokenBlacklist.id)
+            .yield_per(1000)
+        )
+        added = 0
+        for row_id, token in rows:
+            self._bloom.add(token)
+            with self._lock:
+                # A cached "not revoked" answer may predate a revocation from another worker
+                if self._decisions.get(token) is False:
+                    del self._decisions[token]
+            if row_id > last_synced_id:
+                self._last_synced_id = row_id
+                added += 1
+
+        if len(self._bloom) > self.bloom_capacity:
+            self.rebuild(db)
+        self._sync_watermarks(db)
+        self._ready = True
+        return added
+
+    def rebuild(self, db: Session):
+        """Rebuild the filter from scratch, resizing it if the table outgrew the capacity."""
+        total = db.query(TokenBlacklist.id).count()
+        capacity = max(self.bloom_capacity, total * 2)
+        bloom = BloomFilter(capacity, self.bloom_error_rate)
+        last_id = 0
+        for row_id, token in db.query(TokenBlacklist.id, TokenBlacklist.token).order_by(TokenBlacklist.id).yield_per(1000):
+            bloom.add(token)
+            last_id = row_id
+        self.bloom_capacity = capacity
+        self._bloom = bloom
+        self._last_synced_id = max(self._last_synced_id, last_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+            lru_entries = len(self._decisions)
+            watermark_entries = len(self._watermarks)
+        lookups = counters["lru_hits"] + counters["lru_misses"]
+        bloom_positives = counters["db_lookups"]
+        return {
+            **counters,
+            "ready": self._ready,
+            "lru_entries": lru_entries,
+            "lru_size": self.lru_size,
+            "lru_hit_rate": counters["lru_hits"] / lookups if lookups else 0.0,
+            "observed_false_positive_rate": counters["false_positives"] / bloom_positives if bloom_positives else 0.0,
+            "watermark_entries": watermark_entries,
+            "last_synced_id": self._last_synced_id,
+            "bloom": self._bloom.stats(),
+        }
+
+def _to_epoch(value: datetime) -> float:
+    # Stored datetimes are naive UTC, like the rest of the schema
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+revocation_cache = RevocationCache(
+    lru_size=settings.REVOCATION_CACHE_SIZE,
+    bloom_capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    bloom_error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+)
+
+def _sync_once():
+    db = SessionLocal()
+    try:
+        return revocation_cache.sync(db)
+    finally:
+        db.close()
+
+async def run_revocation_sync(interval: float = settings.REVOCATION_SYNC_INTERVAL):
+    # Background task started from the app lifespan
+    while True:
+        try:
+            await run_in_threadpool(_sync_once)
+        except Exception:
+            logger.exception("Token blacklist sync failed")
+        await asyncio.sleep(interval)
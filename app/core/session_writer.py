@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import threading
+from sqlalchemy import insert
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.mysql_connection import SessionLocal
+from app.models import JwtSession
+
+logger = logging.getLogger(__name__)
+
+class JwtSessionWriter:
+    """
+    Write-behind buffer for jwt_sessions audit rows.
+
+    Requests only append to an in-memory buffer; a background task flushes it every few
+    milliseconds with one multi-row INSERT. Rows still buffered when a worker dies are lost,
+    which is acceptable because nothing reads jwt_sessions on the request path.
+    """
+
+    def __init__(self, interval_ms: int, max_batch: int, max_pending: int):
+        self.interval = interval_ms / 1000
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._pending = []
+        self._lock = threading.Lock()
+        self.counters = {
+            "enqueued": 0,
+            "written": 0,
+            "flushes": 0,
+            "dropped": 0,
+        }
+
+    def enqueue(self, row: dict):
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.counters["dropped"] += 1
+                return
+            self._pending.append(row)
+            self.counters["enqueued"] += 1
+
+    def flush(self) -> int:
+        """Write up to max_batch buffered rows. Returns the number written."""
+        with self._lock:
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+        if not batch:
+            return 0
+
+        db = SessionLocal()
+        try:
+            db.execute(insert(JwtSession), batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Put the rows back so the next tick retries them, as long as there is room
+            with self._lock:
+                room = self.max_pending - len(self._pending)
+                self._pending[:0] = batch[:room]
+                self.counters["dropped"] += len(batch) - max(room, 0)
+            raise
+        finally:
+            db.close()
+
+        with self._lock:
+            self.counters["written"] += len(batch)
+            self.counters["flushes"] += 1
+        return len(batch)
+
+    def flush_all(self):
+        while self.flush():
+            pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "pending": len(self._pending)}
+
+jwt_session_writer = JwtSessionWriter(
+    interval_ms=settings.SESSION_WRITE_BEHIND_INTERVAL_MS,
+    max_batch=settings.SESSION_WRITE_BEHIND_MAX_BATCH,
+    max_pending=settings.SESSION_WRITE_BEHIND_MAX_PENDING,
+)
+
+async def run_session_writer():
+    # Background task started from the app lifespan when SESSION_WRITE_BEHIND is enabled
+    try:
+        while True:
+            await asyncio.sleep(jwt_session_writer.interval)
+            try:
+                await run_in_threadpool(jwt_session_writer.flush)
+            except Exception:
+                logger.exception("Flushing buffered jwt_sessions failed")
+    finally:
+        # Drain whatever is left on shutdown
+        await run_in_threadpool(jwt_session_writer.flush_all)
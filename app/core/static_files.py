@@ -0,0 +1,263 @@
+import argparse
+import gzip
+import os
+import re
+import stat
+import threading
+from collections import OrderedDict
+from mimetypes import guess_type
+from typing import Optional, Tuple
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+from app.core.config import settings
+
+# Content-addressed images (with their size variants) and uuid-named uploads never change
+IMMUTABLE_NAME = re.compile(
+    r"^(?:[0-9a-f]{64}(?:_\d+)?|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}_\d+)\.\w+$"
+)
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+# Preferred first
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+# Files still being written next to the ones they replace (uploads, variants, precompressed siblings)
+TEMP_SUFFIX = ".part"
+RANGE_HEADER = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    (start, end) inclusive for a single "bytes=" range, None to ignore the header. Multiple
+    ranges and invalid ones (last byte before the first) are ignored, as RFC 9110 allows and
+    requires; an unsatisfiable range raises ValueError.
+    """
+    match = RANGE_HEADER.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, min(int(end), size - 1) if end else size - 1
+
+class MemoryFileCache:
+    """LRU of small file contents keyed by path, bounded by total bytes and revalidated by mtime/size."""
+
+    def __init__(self, max_file_size: int, max_bytes: int):
+        self.max_file_size = max_file_size
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, path: str, stat_result: os.stat_result) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != (stat_result.st_mtime_ns, stat_result.st_size):
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(path)
+            self.counters["hits"] += 1
+            return entry[1]
+
+    def load(self, path: str, stat_result: os.stat_result) -> Optional[bytes]:
+        """Read a small file into the cache; None if it is too big to keep."""
+        if stat_result.st_size > self.max_file_size:
+            return None
+        with open(path, "rb") as file:
+            data = file.read()
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._entries[path] = ((stat_result.st_mtime_ns, stat_result.st_size), data)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.counters["evictions"] += 1
+        return data
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_file_size": self.max_file_size,
+            }
+
+async def _iter_file(path: str, start: int, length: int):
+    async with await anyio.open_file(path, "rb") as file:
+        await file.seek(start)
+        while length > 0:
+            chunk = await file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles with cache-friendly responses.
+
+    Content-addressed and uuid-named files get a year-long immutable Cache-Control, everything
+    else a short max-age plus ETag revalidation. Text assets are served from a precompressed
+    .br/.gz sibling when the client accepts it, single byte ranges are answered with 206, and
+    small files are kept in memory so hot assets skip the disk.
+    """
+
+    def __init__(self, *args, memory_cache: MemoryFileCache, max_age: int, immutable_max_age: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.memory_cache = memory_cache
+        self.max_age = max_age
+        self.immutable_max_age = immutable_max_age
+
+    def _lookup(self, path: str, accept_encoding: str):
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return full_path, stat_result, None, None
+        media_type = guess_type(full_path)[0] or "text/plain"
+        if is_compressible(media_type):
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accept_encoding:
+                    continue
+                encoded_path, encoded_stat = self.lookup_path(path + suffix)
+                # A sibling older than the file is stale, so serve the original instead
+                if encoded_stat is not None and stat.S_ISREG(encoded_stat.st_mode) and encoded_stat.st_mtime >= stat_result.st_mtime:
+                    return encoded_path, encoded_stat, media_type, encoding
+        return full_path, stat_result, media_type, None
+
+    def _cache_control(self, path: str) -> str:
+        if IMMUTABLE_NAME.match(os.path.basename(path)):
+            return f"public, max-age={self.immutable_max_age}, immutable"
+        return f"public, max-age={self.max_age}"
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        name = os.path.basename(path)
+        if name.startswith(".") or name.endswith(TEMP_SUFFIX):
+            raise HTTPException(status_code=404)
+
+        request_headers = Headers(scope=scope)
+        try:
+            full_path, stat_result, media_type, encoding = await anyio.to_thread.run_sync(
+                self._lookup, path, request_headers.get("accept-encoding", "")
+            )
+        except PermissionError:
+            raise HTTPException(status_code=401)
+
+        if media_type is None:
+            # Directories, html mode and 404s behave exactly as in StaticFiles
+            return await super().get_response(path, scope)
+
+        headers = {"cache-control": self._cache_control(path), "accept-ranges": "bytes"}
+        if is_compressible(media_type):
+            headers["vary"] = "Accept-Encoding"
+        if encoding is not None:
+            headers["content-encoding"] = encoding
+
+        # Reuse FileResponse for the Last-Modified and ETag headers; the encoded sibling has its
+        # own stat, so its ETag differs from the identity one
+        response_headers = FileResponse(full_path, stat_result=stat_result, media_type=media_type).headers
+        headers["etag"] = response_headers["etag"]
+        headers["last-modified"] = response_headers["last-modified"]
+        if self.is_not_modified(Headers(headers=headers), request_headers):
+            return NotModifiedResponse(Headers(headers=headers))
+
+        size = stat_result.st_size
+        byte_range = None
+        range_header = request_headers.get("range")
+        if range_header and encoding is None and request_headers.get("if-range", headers["etag"]) == headers["etag"]:
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                return Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+
+        start, end = byte_range if byte_range is not None else (0, size - 1)
+        length = end - start + 1
+        status_code = 206 if byte_range is not None else 200
+        if byte_range is not None:
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+        headers["content-length"] = str(length)
+
+        if scope["method"] == "HEAD":
+            return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+        data = None
+        if size <= self.memory_cache.max_file_size:
+            data = self.memory_cache.get(full_path, stat_result)
+            if data is None:
+                data = await anyio.to_thread.run_sync(self.memory_cache.load, full_path, stat_result)
+        if data is not None:
+            body = data if byte_range is None else data[start:end + 1]
+            return Response(body, status_code=status_code, headers=headers, media_type=media_type)
+
+        return StreamingResponse(_iter_file(full_path, start, length), status_code=status_code, headers=headers, media_type=media_type)
+
+static_memory_cache = MemoryFileCache(
+    max_file_size=settings.STATIC_MEMORY_CACHE_MAX_FILE_SIZE,
+    max_bytes=settings.STATIC_MEMORY_CACHE_MAX_BYTES,
+)
+
+def static_files(directory: str) -> CachedStaticFiles:
+    return CachedStaticFiles(
+        directory=directory,
+        memory_cache=static_memory_cache,
+        max_age=settings.STATIC_MAX_AGE,
+        immutable_max_age=settings.STATIC_IMMUTABLE_MAX_AGE,
+    )
+
+def precompress(directory: str) -> int:
+    """Write .gz (and .br, when the brotli package is installed) siblings for text assets."""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            media_type = guess_type(path)[0]
+            if name.startswith(".") or name.endswith((".gz", ".br", TEMP_SUFFIX)) or media_type is None or not is_compressible(media_type):
+                continue
+            with open(path, "rb") as file:
+                data = file.read()
+            siblings = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                siblings.append((".br", brotli.compress(data, quality=11)))
+            for suffix, compressed in siblings:
+                # Only worth keeping when it actually saves bytes
+                if len(compressed) < len(data):
+                    # Written aside and renamed, so a half-written sibling is never served
+                    temp_path = os.path.join(root, f".{name}{suffix}{TEMP_SUFFIX}")
+                    with open(temp_path, "wb") as file:
+                        file.write(compressed)
+                    os.replace(temp_path, path + suffix)
+                    written += 1
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompress text assets under a static directory")
+    parser.add_argument("directory", nargs="?", default="static")
+    args = parser.parse_args()
+    print(f"Wrote {precompress(args.directory)} precompressed files")
@@ -0,0 +1,180 @@
+import contextvars
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from app.core.config import settings
+
+# Set per request by RequestContextMiddleware: request_id, method, started and the ASGI scope
+request_context = contextvars.ContextVar("request_context", default=None)
+
+def current_request_id():
+    context = request_context.get()
+    return context["request_id"] if context is not None else None
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the id, route and elapsed time of the request that logged them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = request_context.get()
+        if context is not None:
+            scope = context["scope"]
+            # The router stores the matched route on the scope, so this is the path template
+            route = scope.get("route")
+            record.request_id = context["request_id"]
+            record.method = context["method"]
+            record.route = getattr(route, "path", scope["path"])
+            record.latency_ms = round((time.perf_counter() - context["started"]) * 1000, 2)
+        return True
+
+class StormFilter(logging.Filter):
+    """
+    Caps how many records with the same logger, level and message template get through per
+    window: the first `burst` pass, after that only every `sample_every`-th. The next record
+    that passes carries the number suppressed since, so an outage shows up as a handful of
+    lines with counts rather than one line per failed request.
+    """
+
+    def __init__(self, window: float, burst: int, sample_every: int):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.sample_every = sample_every
+        self._windows = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        exception_type = type(record.exc_info[1]) if record.exc_info else None
+        key = (record.name, record.levelno, record.msg if isinstance(record.msg, str) else type(record.msg), exception_type)
+        now = time.monotonic()
+        with self._lock:
+            started, seen, suppressed = self._windows.get(key, (now, 0, 0))
+            if now - started > self.window:
+                started, seen = now, 0
+            seen += 1
+            allowed = seen <= self.burst or (seen - self.burst) % self.sample_every == 0
+            if not allowed:
+                self._windows[key] = (started, seen, suppressed + 1)
+                self.suppressed += 1
+                return False
+            self._windows[key] = (started, seen, 0)
+            if len(self._windows) > 10000:
+                self._windows.clear()
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+class JsonFormatter(logging.Formatter):
+    FIELDS = ("request_id", "method", "route", "latency_ms", "suppressed")
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in self.FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = "".join(traceback.format_exception(*record.exc_info))
+        return json.dumps(entry, default=str)
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks or formats on the caller's thread. Records are enqueued as
+    they are, so tracebacks are rendered by the listener thread, and dropped when the queue is
+    full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def _daily_file_handler(log_dir: str, name: str) -> TimedRotatingFileHandler:
+    # Rotated files are named <name>.log.<YYYY-MM-DD>, the naming backupCount pruning expects
+    handler = TimedRotatingFileHandler(
+        os.path.join(log_dir, f"{name}.log"), when="midnight", backupCount=settings.LOG_RETENTION_DAYS, encoding="utf-8", delay=True
+    )
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+class LogPipeline:
+    """The queue handler and listener thread set up by configure_logging; idle until then."""
+
+    def __init__(self):
+        self.queue_handler = None
+        self.storm_filter = None
+        self.listener = None
+
+    def start(self, log_dir: str):
+        os.makedirs(log_dir, exist_ok=True)
+
+        general_handler = _daily_file_handler(log_dir, "general_errors")
+        db_handler = _daily_file_handler(log_dir, "database_errors")
+        db_handler.addFilter(logging.Filter("db_logger"))
+
+        log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+        self.queue_handler = DroppingQueueHandler(log_queue)
+        self.storm_filter = StormFilter(
+            window=settings.LOG_STORM_WINDOW_SECONDS,
+            burst=settings.LOG_STORM_BURST,
+            sample_every=settings.LOG_STORM_SAMPLE_EVERY,
+        )
+        # Storm filter first so suppressed records don't pay for the request context lookup
+        self.queue_handler.addFilter(self.storm_filter)
+        self.queue_handler.addFilter(RequestContextFilter())
+
+        root = logging.getLogger()
+        root.handlers = [self.queue_handler]
+        root.setLevel(settings.LOG_LEVEL)
+
+        self.listener = QueueListener(log_queue, general_handler, db_handler, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        # Drains whatever is still queued before returning
+        if self.listener is not None:
+            self.listener.stop()
+
+    def stats(self) -> dict:
+        if self.queue_handler is None:
+            return {"running": False}
+        return {
+            "running": True,
+            "queued": self.queue_handler.queue.qsize(),
+            "queue_size": self.queue_handler.queue.maxsize,
+            "dropped_queue_full": self.queue_handler.dropped,
+            "suppressed_by_storm_filter": self.storm_filter.suppressed,
+        }
+
+log_pipeline = LogPipeline()
+
+def configure_logging(log_dir: str = "logs") -> LogPipeline:
+    """
+    Route the root logger through a bounded queue to a listener thread that writes JSON lines
+    to logs/general_errors.log, and db_logger records also to logs/database_errors.log, both
+    rotated at midnight.
+
+    Called from the app lifespan, so importing app modules (scripts, benchmarks) creates no
+    log files or threads.
+    """
+    log_pipeline.start(log_dir)
+    return log_pipeline
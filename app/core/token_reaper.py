@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Callable
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.advisory_lock import advisory_lock
+from app.core.mysql_connection import SessionLocal, engine, replica_engines
+from app.models import JwtSession, RefreshToken, TokenBlacklist, TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+# Access tokens live this long, so a blacklist entry or watermark is useless once it is older
+ACCESS_TOKEN_LIFETIME = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRY_MINUTES)
+
+def _expired_conditions(now: datetime, retention: timedelta):
+    cutoff = now - retention
+    return [
+        (JwtSession, JwtSession.expires_at < cutoff),
+        (RefreshToken, RefreshToken.expires_at < cutoff),
+        (TokenBlacklist, TokenBlacklist.blacklisted_at < cutoff - ACCESS_TOKEN_LIFETIME),
+        (TokenRevocation, TokenRevocation.revoked_before < cutoff - ACCESS_TOKEN_LIFETIME),
+    ]
+
+def _replica_lag(replica) -> float | None:
+    with replica.connect() as connection:
+        try:
+            status = connection.execute(text("SHOW REPLICA STATUS")).mappings().first()
+            column = "Seconds_Behind_Source"
+        except Exception:
+            # MySQL before 8.0.22
+            connection.rollback()
+            status = connection.execute(text("SHOW SLAVE STATUS")).mappings().first()
+            column = "Seconds_Behind_Master"
+    # No status row, or NULL while the replication threads are stopped
+    if status is None or status[column] is None:
+        return None
+    return float(status[column])
+
+def replication_lag() -> float | None:
+    """The largest lag across the MySQL read replicas, or None when none of them reports one."""
+    lags = []
+    for replica in replica_engines:
+        if replica.dialect.name != "mysql":
+            continue
+        try:
+            lag = _replica_lag(replica)
+        except Exception:
+            logger.warning("Could not read replication lag from %s", replica.url.host, exc_info=True)
+            continue
+        if lag is not None:
+            lags.append(lag)
+    return max(lags, default=None)
+
+class TokenReaper:
+    """
+    Deletes expired rows from the session tables in small primary-key-ordered chunks.
+
+    Each chunk is its own short transaction. Between chunks the reaper sleeps in proportion
+    to how long the chunk took, and waits out replication lag above the configured limit
+    when a lag probe is available.
+    """
+
+    def __init__(self, chunk_size: int, retention: timedelta, sleep_factor: float,
+                 max_replication_lag: float, replication_lag: Callable[[], float | None] = None):
+        self.chunk_size = chunk_size
+        self.retention = retention
+        self.sleep_factor = sleep_factor
+        self.max_replication_lag = max_replication_lag
+        self.replication_lag = replication_lag
+        self.last_run = None
+
+    def _throttle(self, chunk_seconds: float):
+        time.sleep(chunk_seconds * self.sleep_factor)
+        if self.replication_lag is None:
+            return
+        lag = self.replication_lag()
+        while lag is not None and lag > self.max_replication_lag:
+            logger.info("Token reaper paused, replication lag is %.1fs", lag)
+            time.sleep(min(lag, 30))
+            lag = self.replication_lag()
+
+    def _reap_table(self, db: Session, model, condition, dry_run: bool) -> int:
+        primary_key = model.__mapper__.primary_key[0]
+        removed = 0
+        last_key = None
+        while True:
+            started_at = time.monotonic()
+            query = db.query(primary_key).filter(condition)
+            if last_key is not None:
+                query = query.filter(primary_key > last_key)
+            keys = [key for (key,) in query.order_by(primary_key).limit(self.chunk_size)]
+            if not keys:
+                break
+
+            if not dry_run:
+                db.query(model).filter(primary_key.in_(keys)).delete(synchronize_session=False)
+            db.commit()
+            removed += len(keys)
+            last_key = keys[-1]
+
+            if len(keys) < self.chunk_size:
+                break
+            self._throttle(time.monotonic() - started_at)
+        return removed
+
+    def run(self, db: Session, dry_run: bool = False) -> dict:
+        """Reap every session table once. Returns the number of rows removed per table."""
+        started_at = time.monotonic()
+        removed = {}
+        for model, condition in _expired_conditions(datetime.utcnow(), self.retention):
+            removed[model.__tablename__] = self._reap_table(db, model, condition, dry_run)
+
+        self.last_run = {
+            "finished_at": datetime.utcnow().isoformat(),
+            "duration_seconds": round(time.monotonic() - started_at, 3),
+            "dry_run": dry_run,
+            "removed": removed,
+        }
+        logger.info("Token reaper removed %s", removed)
+        return removed
+
+token_reaper = TokenReaper(
+    chunk_size=settings.REAPER_CHUNK_SIZE,
+    retention=timedelta(hours=settings.REAPER_RETENTION_HOURS),
+    sleep_factor=settings.REAPER_SLEEP_FACTOR,
+    max_replication_lag=settings.REAPER_MAX_REPLICATION_LAG,
+    replication_lag=replication_lag if replica_engines else None,
+)
+
+def _run_once(dry_run: bool = False) -> dict | None:
+    # Every worker starts the reaper; whichever takes the lock first runs it and the others
+    # skip this round
+    with advisory_lock(engine, "token_reaper", 0) as acquired:
+        if not acquired:
+            logger.info("Token reaper skipped, another worker is running it")
+            return None
+        db = SessionLocal()
+        try:
+            return token_reaper.run(db, dry_run=dry_run)
+        finally:
+            db.close()
+
+async def run_token_reaper(interval: float = settings.REAPER_INTERVAL_SECONDS):
+    # Background task started from the app lifespan when REAPER_ENABLED is set
+    while True:
+        try:
+            await run_in_threadpool(_run_once)
+        except Exception:
+            logger.exception("Token reaper run failed")
+        await asyncio.sleep(interval)
+
+if __name__ == "__main__":
+    # python -m app.core.token_reaper [--dry-run]
+    parser = argparse.ArgumentParser(description="Delete expired jwt_sessions, refresh_tokens and token_blacklist rows.")
+    parser.add_argument("--dry-run", action="store_true", help="count expired rows without deleting them")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    removed = _run_once(dry_run=args.dry_run)
+    if removed is None:
+        print("Another process is running the token reaper")
+    else:
+        for table, count in removed.items():
+            print(f"{table}: {count}")
@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from app.core.config import settings
+
+class TTLCache:
+    """Small thread-safe LRU whose entries also expire after a fixed time-to-live."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class LocalSharedCache:
+    """In-process stand-in for the shared tier, used for tests and single-worker setups."""
+
+    def __init__(self, ttl: float):
+        self._cache = TTLCache(max_size=100000, ttl=ttl)
+
+    def get(self, key: str):
+        value = self._cache.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: dict):
+        self._cache.set(key, json.dumps(value))
+
+    def delete(self, key: str):
+        self._cache.delete(key)
+
+class RedisSharedCache:
+    """Shared tier backed by Redis so every worker sees the same entries and invalidations."""
+
+    def __init__(self, url: str, ttl: float):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("PROFILE_CACHE_SHARED_URL points at Redis but the redis package is not installed")
+        self._client = redis.Redis.from_url(url, socket_timeout=0.05)
+        self.ttl = int(ttl)
+
+    def get(self, key: str):
+        value = self._client.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: dict):
+        self._client.set(key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+def _shared_backend():
+    url = settings.PROFILE_CACHE_SHARED_URL
+    if not url:
+        return None
+    if url == "local":
+        return LocalSharedCache(ttl=settings.PROFILE_CACHE_SHARED_TTL)
+    return RedisSharedCache(url, ttl=settings.PROFILE_CACHE_SHARED_TTL)
+
+class UserProfileCache:
+    """
+    Two-tier cache of serialized user profiles keyed by user id: an in-process TTL+LRU in front
+    of an optional shared tier. The user_service functions that change a User invalidate it.
+    """
+
+    def __init__(self, local: TTLCache, shared=None):
+        self.local = local
+        self.shared = shared
+        self._lock = threading.Lock()
+        self.counters = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "shared_errors": 0,
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"user_profile:{user_id}"
+
+    def get(self, user_id: int):
+        profile = self.local.get(user_id)
+        if profile is not None:
+            self._count("local_hits")
+            return profile
+
+        if self.shared is not None:
+            try:
+                profile = self.shared.get(self._key(user_id))
+            except Exception:
+                self._count("shared_errors")
+                profile = None
+            if profile is not None:
+                self._count("shared_hits")
+                self.local.set(user_id, profile)
+                return profile
+
+        self._count("misses")
+        return None
+
+    def set(self, user_id: int, profile: dict):
+        self.local.set(user_id, profile)
+        if self.shared is not None:
+            try:
+                self.shared.set(self._key(user_id), profile)
+            except Exception:
+                self._count("shared_errors")
+
+    def invalidate(self, user_id: int):
+        self._count("invalidations")
+        self.local.delete(user_id)
+        if self.shared is not None:
+            try:
+                self.shared.delete(self._key(user_id))
+            except Exception:
+                self._count("shared_errors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        lookups = counters["local_hits"] + counters["shared_hits"] + counters["misses"]
+        hits = counters["local_hits"] + counters["shared_hits"]
+        return {
+            **counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "local_entries": len(self.local),
+            "local_max_size": self.local.max_size,
+            "local_ttl": self.local.ttl,
+            "shared_backend": type(self.shared).__name__ if self.shared is not None else None,
+        }
+
+user_profile_cache = UserProfileCache(
+    local=TTLCache(max_size=settings.PROFILE_CACHE_SIZE, ttl=settings.PROFILE_CACHE_TTL),
+    shared=_shared_backend(),
+)
@@ -1,18 +1,71 @@
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.utils.exception_handler import register_exception_handlers
-from fastapi.staticfiles import StaticFiles
+from app.core.structured_logging import configure_logging, log_pipeline
+from app.middleware.request_body_middleware import RequestBodyMiddleware
+from app.middleware.request_context_middleware import RequestContextMiddleware
+from app.middleware.upload_limit_middleware import UploadLimitMiddleware, MULTIPART_OVERHEAD
+from app.core.request_metrics import RequestMetricsMiddleware, prometheus_metrics
+from app.core.query_inspector import QueryInspectorMiddleware
 from dotenv import load_dotenv
 from app.api.v1.router import api_router
 from app.core.config import settings
+from app.utils.helper import verify_metrics_token
+from app.core.revocation_cache import run_revocation_sync
+from app.core.password_hasher import password_hasher
+from app.core.image_store import profile_picture_store
+from app.core.static_files import static_files
+from app.core.session_writer import run_session_writer
+from app.core.token_reaper import run_token_reaper
+from app.core.availability_filter import run_availability_sync
+from app.core.friend_graph import run_friend_graph_sync
+from app.core.feed_writer import run_feed_writer
 
 # Load environment variables from .env file
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging(settings.LOG_DIR)
+    # Background tasks that live as long as the worker
+    background_tasks = [
+        asyncio.create_task(run_revocation_sync()),
+        asyncio.create_task(run_availability_sync()),
+        asyncio.create_task(run_friend_graph_sync()),
+        asyncio.create_task(run_feed_writer()),
+    ]
+    if settings.SESSION_WRITE_BEHIND:
+        background_tasks.append(asyncio.create_task(run_session_writer()))
+    if settings.REAPER_ENABLED:
+        background_tasks.append(asyncio.create_task(run_token_reaper()))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    password_hasher.shutdown()
+    profile_picture_store.shutdown()
+    log_pipeline.stop()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_STR}/openapi.json"
+    openapi_url=f"{settings.API_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Capture JSON request bodies for the validation error handler to echo back
+if settings.VALIDATION_ERRORS_ECHO_BODY:
+    app.add_middleware(RequestBodyMiddleware)
+
+# Refuse oversized profile pictures while they are received rather than after spooling them
+app.add_middleware(
+    UploadLimitMiddleware,
+    paths=[f"{settings.API_STR}/user/upload-profile-picture"],
+    max_body_bytes=profile_picture_store.max_bytes + MULTIPART_OVERHEAD,
+    too_large=profile_picture_store.too_large,
 )
 
 # Configure CORS
@@ -24,15 +77,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# N+1 detection on sampled requests (every request with QUERY_INSPECTOR_MODE=dev)
+app.add_middleware(QueryInspectorMiddleware)
+
+# Per-route latency, status and SQL usage, exported on /metrics
+app.add_middleware(RequestMetricsMiddleware, routes=app.router.routes)
+
+# Outermost, so every log record of the request carries its id
+app.add_middleware(RequestContextMiddleware)
+
 # Register all exception handlers
 register_exception_handlers(app)
 
-# Mount the static folder to serve images
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Mount the static folder to serve images, with long-lived caching for the uuid/hash-named ones
+app.mount("/static", static_files(directory="static"), name="static")
 
 # Include the router from your routes
 app.include_router(api_router, prefix=settings.API_STR)
 
+# Prometheus scrape endpoint, scraped with METRICS_TOKEN as the bearer token
+app.add_api_route("/metrics", prometheus_metrics, include_in_schema=False, dependencies=[Depends(verify_metrics_token)])
+
 @app.get("/")
 async def root():
     html_content = """
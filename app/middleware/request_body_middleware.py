@@ -1,12 +1,70 @@
+import orjson
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-
-# Middleware to add request data to RequestValidationError
-class RequestBodyMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        try:
-            body = await request.json()
-        except Exception:
-            body = {}
-        request.state.body = body
-        return await call_next(request)
\ No newline at end of file
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+RAW_BODY_KEY = "raw_body"
+
+def _is_json(scope: Scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"content-type":
+            media_type = value.split(b";", 1)[0].strip().lower()
+            return media_type == b"application/json" or media_type.endswith(b"+json")
+    return False
+
+# Middleware to keep the request data around for the RequestValidationError handler
+class RequestBodyMiddleware:
+    """
+    Pure ASGI middleware that buffers JSON request bodies once and replays them to the app.
+
+    The raw bytes are stored on request.state and only decoded, by request_body(), when a
+    handler asks for them. Other content types, like multipart uploads, are passed through
+    untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not _is_json(scope):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        pending = None
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                # Client went away mid-body; hand the disconnect on after what we have
+                pending = message
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+
+        # A single-message body, the usual case, is replayed as the same bytes object
+        body = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+        scope.setdefault("state", {})[RAW_BODY_KEY] = body
+
+        replayed = False
+
+        async def replay() -> Message:
+            nonlocal replayed, pending
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            if pending is not None:
+                message, pending = pending, None
+                return message
+            return await receive()
+
+        await self.app(scope, replay, send)
+
+def request_body(request: Request):
+    """Decode the JSON body captured by RequestBodyMiddleware; None if absent or invalid."""
+    raw = request.scope.get("state", {}).get(RAW_BODY_KEY)
+    if not raw:
+        return None
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return None
@@ -0,0 +1,46 @@
+import time
+from uuid import uuid4
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.structured_logging import request_context
+
+# Middleware to tag log records with the request they came from
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware that gives every request an id, taken from X-Request-ID when the
+    client or proxy sent one, makes it visible to log records through request_context, and
+    echoes it back in the response headers.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid4().hex
+
+        token = request_context.set({
+            "request_id": request_id,
+            "method": scope["method"],
+            "started": time.perf_counter(),
+            "scope": scope,
+        })
+
+        async def send_with_request_id(message: Message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
+        # Deliberately left set when an exception escapes: the catch-all handler runs in
+        # ServerErrorMiddleware, outside this one, and still needs it. Every request runs in
+        # its own task, so the value can't leak into the next one.
+        request_context.reset(token)
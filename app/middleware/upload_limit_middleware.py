@@ -0,0 +1,50 @@
+from typing import Callable, Iterable
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+class UploadLimitMiddleware:
+    """
+    Pure ASGI middleware that caps request bodies on upload routes while they are received.
+
+    A Content-Length over the limit is refused before any of the body is read. Otherwise the
+    bytes are counted as they arrive, and the upload is cut off with the 413 as soon as they
+    pass the limit, so the multipart parser never spools more than max_body_bytes to disk.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str], max_body_bytes: int, too_large: Callable[[], HTTPException]):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_body_bytes = max_body_bytes
+        self.too_large = too_large
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_body_bytes:
+                # Outside the app's exception handlers, so the error body is built here in the
+                # same shape as http_exception_handler's
+                error = self.too_large()
+                response = JSONResponse(status_code=error.status_code, content={"errors": {"message": error.detail}})
+                await response(scope, receive, send)
+                return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Re-raised by FastAPI's body parsing and answered by http_exception_handler
+                    raise self.too_large()
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,36 @@
+"""add friends composite indexes
+
+Revision ID: 7b4e1c9d2a05
+Revises: 3f9c2d7a1b6e
+Create Date: 2026-10-18 14:02:17.316842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b4e1c9d2a05'
+down_revision: Union[str, None] = '3f9c2d7a1b6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the oldest row of any duplicated pair so the unique constraint can be created
+    op.execute(
+        "DELETE duplicate FROM friends duplicate "
+        "JOIN friends original ON original.user_id = duplicate.user_id "
+        "AND original.friend_id = duplicate.friend_id AND original.id < duplicate.id"
+    )
+    op.create_unique_constraint('uq_friends_user_id_friend_id', 'friends', ['user_id', 'friend_id'])
+    op.create_index('ix_friends_user_id_created_at_friend_id', 'friends', ['user_id', 'created_at', 'friend_id'], unique=False)
+
+
+def downgrade() -> None:
+    # MySQL backs the user_id foreign key with these indexes, so give it its own one back first
+    op.create_index('ix_friends_user_id', 'friends', ['user_id'], unique=False)
+    op.drop_index('ix_friends_user_id_created_at_friend_id', table_name='friends')
+    op.drop_constraint('uq_friends_user_id_friend_id', 'friends', type_='unique')
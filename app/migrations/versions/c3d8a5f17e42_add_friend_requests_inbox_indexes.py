@@ -0,0 +1,31 @@
+"""add friend_requests inbox indexes
+
+Revision ID: c3d8a5f17e42
+Revises: 7b4e1c9d2a05
+Create Date: 2026-10-18 16:27:55.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8a5f17e42'
+down_revision: Union[str, None] = '7b4e1c9d2a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_friend_requests_receiver_id_status_sent_at', 'friend_requests', ['receiver_id', 'status', 'sent_at'], unique=False)
+    op.create_index('ix_friend_requests_sender_id_status_sent_at', 'friend_requests', ['sender_id', 'status', 'sent_at'], unique=False)
+
+
+def downgrade() -> None:
+    # MySQL backs the foreign keys with these indexes, so give them their own ones back first
+    op.create_index('ix_friend_requests_receiver_id', 'friend_requests', ['receiver_id'], unique=False)
+    op.create_index('ix_friend_requests_sender_id', 'friend_requests', ['sender_id'], unique=False)
+    op.drop_index('ix_friend_requests_sender_id_status_sent_at', table_name='friend_requests')
+    op.drop_index('ix_friend_requests_receiver_id_status_sent_at', table_name='friend_requests')
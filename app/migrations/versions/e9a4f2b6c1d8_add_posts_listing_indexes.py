@@ -0,0 +1,32 @@
+"""add posts listing indexes
+
+Revision ID: e9a4f2b6c1d8
+Revises: c3d8a5f17e42
+Create Date: 2026-10-18 18:05:12.417630
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a4f2b6c1d8'
+down_revision: Union[str, None] = 'c3d8a5f17e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_posts_user_id_is_deleted_created_at_id', 'posts', ['user_id', 'is_deleted', 'created_at', 'id'], unique=False)
+    op.create_index('ix_posts_location_is_deleted_trip_start_date', 'posts', ['location', 'is_deleted', 'trip_start_date', 'id', 'trip_end_date'], unique=False)
+    op.create_index('ix_posts_is_deleted_trip_start_date', 'posts', ['is_deleted', 'trip_start_date', 'id', 'trip_end_date'], unique=False)
+
+
+def downgrade() -> None:
+    # MySQL backs the user_id foreign key with the first index, so give it its own one back first
+    op.create_index('ix_posts_user_id', 'posts', ['user_id'], unique=False)
+    op.drop_index('ix_posts_is_deleted_trip_start_date', table_name='posts')
+    op.drop_index('ix_posts_location_is_deleted_trip_start_date', table_name='posts')
+    op.drop_index('ix_posts_user_id_is_deleted_created_at_id', table_name='posts')
@@ -0,0 +1,26 @@
+"""add users profile_picture index
+
+Revision ID: f2b7c4e9a831
+Revises: e9a4f2b6c1d8
+Create Date: 2026-10-18 19:42:37.215904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c4e9a831'
+down_revision: Union[str, None] = 'e9a4f2b6c1d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_profile_picture', 'users', ['profile_picture'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_profile_picture', table_name='users')
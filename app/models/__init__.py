@@ -7,6 +7,7 @@ from app.models.group_chat import GroupChat
 from app.models.group_user_role import GroupUserRole
 from app.models.post import Post
 from app.models.token_blacklist import TokenBlacklist
+from app.models.token_revocation import TokenRevocation
 from app.models.jwt_session import JwtSession
 from app.models.refresh_token import RefreshToken
 from app.models.friend_request import FriendRequest
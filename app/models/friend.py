@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 import datetime
 from app.models.base import Base
 
 class Friend(Base):
+    # A friendship is stored as two rows, (a, b) and (b, a), so either side's list is one index range
     __tablename__ = 'friends'
+    __table_args__ = (
+        UniqueConstraint('user_id', 'friend_id', name='uq_friends_user_id_friend_id'),
+        # Keyset order of the friends list: newest first, friend_id breaking ties
+        Index('ix_friends_user_id_created_at_friend_id', 'user_id', 'created_at', 'friend_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -12,4 +18,4 @@ class Friend(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
 
     user = relationship("User", foreign_keys=[user_id], back_populates="friends")
-    friend = relationship("User", foreign_keys=[friend_id])
\ No newline at end of file
+    friend = relationship("User", foreign_keys=[friend_id])
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 import datetime
 import enum
@@ -12,6 +12,11 @@ class FriendRequestStatus(enum.Enum):
 
 class FriendRequest(Base):
     __tablename__ = 'friend_requests'
+    __table_args__ = (
+        # Inbox and outbox pages: one user's requests in a status, newest first
+        Index('ix_friend_requests_receiver_id_status_sent_at', 'receiver_id', 'status', 'sent_at'),
+        Index('ix_friend_requests_sender_id_status_sent_at', 'sender_id', 'status', 'sent_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, String, Boolean
+from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, String, Boolean, Index
 from sqlalchemy.orm import relationship
 import datetime
 from app.models.base import Base
 
 class Post(Base):
     __tablename__ = 'posts'
+    # Both listings first page through an index alone, then load the page's rows by id
+    __table_args__ = (
+        # A user's posts, newest first
+        Index('ix_posts_user_id_is_deleted_created_at_id', 'user_id', 'is_deleted', 'created_at', 'id'),
+        # Trips in (trip_start_date, id) order, with trip_end_date last so the window check needs no row lookup
+        Index('ix_posts_location_is_deleted_trip_start_date', 'location', 'is_deleted', 'trip_start_date', 'id', 'trip_end_date'),
+        Index('ix_posts_is_deleted_trip_start_date', 'is_deleted', 'trip_start_date', 'id', 'trip_end_date'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
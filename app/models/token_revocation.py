@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy.dialects import mysql
+import datetime
+from app.models.base import Base
+
+class TokenRevocation(Base):
+    __tablename__ = 'token_revocations'
+
+    # Every access token for the user issued before revoked_before is treated as logged out
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True, autoincrement=False)
+    # Indexed for the revocation cache's sync of recently moved watermarks and for the reaper
+    revoked_before = Column(DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql'), default=datetime.datetime.utcnow, nullable=False, index=True)
@@ -12,7 +12,8 @@ class User(Base):
     email = Column(String(120), unique=True, nullable=False)
     password = deferred(Column(String(255), nullable=False))
     phone_number = Column(String(50), nullable=False)
-    profile_picture = deferred(Column(String(255), nullable=True))
+    # Indexed for the "is anyone else still using this image" check when a picture is replaced
+    profile_picture = deferred(Column(String(255), nullable=True, index=True))
     date_of_birth = Column(Date, nullable=False)
     gender = Column(Enum('male', 'female', 'other', name='gender_enum'), nullable=False)
     city = Column(String(120), nullable=False)
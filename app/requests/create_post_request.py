@@ -0,0 +1,23 @@
+from pydantic import BaseModel, StringConstraints, model_validator
+from typing import Annotated, Optional
+from datetime import timedelta
+from app.core.config import settings
+from app.requests.validators import UtcDatetime
+
+# Both match String(255) columns on the posts table
+PostText = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=255)]
+
+class CreatePostRequest(BaseModel):
+    content: PostText
+    image_url: Optional[PostText] = None
+    location: Optional[PostText] = None
+    trip_start_date: Optional[UtcDatetime] = None
+    trip_end_date: Optional[UtcDatetime] = None
+
+    @model_validator(mode='after')
+    def check_trip_window(self):
+        if self.trip_start_date and self.trip_end_date and self.trip_end_date < self.trip_start_date:
+            raise ValueError('Trip end date cannot be before its start date')
+        if self.trip_start_date and self.trip_end_date and self.trip_end_date - self.trip_start_date > timedelta(days=settings.POSTS_MAX_TRIP_DAYS):
+            raise ValueError(f'A trip cannot be longer than {settings.POSTS_MAX_TRIP_DAYS} days')
+        return self
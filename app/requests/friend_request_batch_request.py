@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+from typing import List
+from app.core.config import settings
+
+class FriendRequestBatchRequest(BaseModel):
+    request_ids: List[int] = Field(min_length=1, max_length=settings.FRIEND_REQUEST_BATCH_MAX)
@@ -0,0 +1,4 @@
+from pydantic import BaseModel
+
+class SendFriendRequest(BaseModel):
+    receiver_id: int
@@ -0,0 +1,98 @@
+# Field types shared by the request models.
+# Each check runs as a plain function against precompiled patterns, in the order and with the
+# error messages the per-model validators used, so clients see the same 422 text.
+
+from pydantic import AfterValidator, PlainSerializer
+from typing import Annotated, List, Optional
+from datetime import date, datetime, timezone
+import json
+import re
+
+USERNAME_PATTERN = re.compile(r"^[a-zA-Z0-9_.-]+$")
+NAME_PATTERN = re.compile(r"^[a-zA-Z\s]+$")
+PHONE_NUMBER_PATTERN = re.compile(r"^\+?1?\d{9,15}$")
+PASSWORD_RULES = [
+    (re.compile(r"[A-Z]"), 'Password must contain at least one uppercase letter'),
+    (re.compile(r"[a-z]"), 'Password must contain at least one lowercase letter'),
+    (re.compile(r"\d"), 'Password must contain at least one digit'),
+    (re.compile(r"[!@#$%^&*(),.?\":{}|<>]"), 'Password must contain at least one special character'),
+]
+GENDERS = frozenset({'male', 'female', 'other'})
+
+def _matches(pattern: re.Pattern, message: str):
+    def validate(v: str) -> str:
+        if not pattern.match(v):
+            raise ValueError(message)
+        return v
+    return validate
+
+def _length_between(low: int, high: int, message: str):
+    def validate(v: str) -> str:
+        if len(v) < low or len(v) > high:
+            raise ValueError(message)
+        return v
+    return validate
+
+def _validate_password(v: str) -> str:
+    if len(v) < 8:
+        raise ValueError('Password must be at least 8 characters long')
+    for pattern, message in PASSWORD_RULES:
+        if not pattern.search(v):
+            raise ValueError(message)
+    return v
+
+def _validate_required(v: str) -> str:
+    if v == "":
+        raise ValueError('Value of this field is required')
+    return v
+
+def _validate_bio(v: str) -> str:
+    if len(v) > 500:
+        raise ValueError('Bio must not exceed 500 characters')
+    return v
+
+def _short_list(too_many: str, too_long: str):
+    def validate(v: List[str]) -> List[str]:
+        if len(v) > 10:
+            raise ValueError(too_many)
+        for item in v:
+            if len(item) > 50:
+                raise ValueError(too_long)
+        return v
+    return validate
+
+def _validate_gender(v: str) -> str:
+    v = v.lower()
+    if v not in GENDERS:
+        raise ValueError('Invalid gender. Choose from: male, female, other')
+    return v
+
+def _validate_not_in_future(v: date) -> date:
+    if v > date.today():
+        raise ValueError('Date of birth cannot be in the future')
+    return v
+
+def _to_naive_utc(v: datetime) -> datetime:
+    # Columns hold naive UTC; mixing aware and naive values would fail on comparison
+    return v.astimezone(timezone.utc).replace(tzinfo=None) if v.tzinfo is not None else v
+
+def _dump_json_list(v: Optional[List[str]]) -> Optional[str]:
+    # The users table keeps these lists as JSON text
+    return json.dumps(v) if v else None
+
+Username = Annotated[str, AfterValidator(_matches(USERNAME_PATTERN, 'Username must contain only letters, numbers, underscores, dots, or dashes')),
+                     AfterValidator(_length_between(3, 30, 'Username must be between 3 and 30 characters long'))]
+Password = Annotated[str, AfterValidator(_validate_password)]
+Name = Annotated[str, AfterValidator(_matches(NAME_PATTERN, 'Name must contain only letters and spaces')),
+                 AfterValidator(_length_between(2, 50, 'Name must be between 2 and 50 characters long'))]
+Gender = Annotated[str, AfterValidator(_validate_gender)]
+PhoneNumber = Annotated[str, AfterValidator(_matches(PHONE_NUMBER_PATTERN, 'Invalid phone number format'))]
+DateOfBirth = Annotated[date, AfterValidator(_validate_not_in_future)]
+# Offsets are converted to UTC; values without one are taken to be UTC already
+UtcDatetime = Annotated[datetime, AfterValidator(_to_naive_utc)]
+RequiredStr = Annotated[str, AfterValidator(_validate_required)]
+Bio = Annotated[str, AfterValidator(_validate_bio)]
+TravelPreferences = Annotated[List[str], AfterValidator(_short_list('You can specify up to 10 travel preferences', 'Each travel preference must not exceed 50 characters')),
+                              PlainSerializer(_dump_json_list, return_type=Optional[str])]
+LanguagesSpoken = Annotated[List[str], AfterValidator(_short_list('You can specify up to 10 languages', 'Each language must not exceed 50 characters')),
+                            PlainSerializer(_dump_json_list, return_type=Optional[str])]
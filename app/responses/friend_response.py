@@ -0,0 +1,51 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class UserCard(BaseModel):
+    id: int
+    username: str
+    name: str
+    profile_picture: Optional[str] = None
+    city: str
+    country: str
+
+class FriendCard(UserCard):
+    friends_since: datetime
+
+class FriendsPageResponse(BaseModel):
+    friends: List[FriendCard]
+    # Pass back as ?cursor= for the next page; None on the last one
+    next_cursor: Optional[str] = None
+
+class MutualFriendsResponse(BaseModel):
+    user_id: int
+    mutual_friends: int
+
+class FriendSuggestion(UserCard):
+    mutual_friends: int
+
+class FriendSuggestionsResponse(BaseModel):
+    suggestions: List[FriendSuggestion]
+
+class FriendRequestItem(BaseModel):
+    id: int
+    sent_at: datetime
+    # The sender in the inbox, the receiver in the outbox
+    user: UserCard
+
+class FriendRequestsPageResponse(BaseModel):
+    requests: List[FriendRequestItem]
+    next_cursor: Optional[str] = None
+
+class SendFriendRequestResponse(BaseModel):
+    message: str
+    request_id: int
+
+class AcceptFriendRequestsResponse(BaseModel):
+    accepted: List[int]
+    skipped: List[int]
+
+class DeclineFriendRequestsResponse(BaseModel):
+    declined: List[int]
+    skipped: List[int]
@@ -0,0 +1,27 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List
+from datetime import datetime
+from app.responses.friend_response import UserCard
+
+class PostResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    content: str
+    image_url: Optional[str] = None
+    location: Optional[str] = None
+    trip_start_date: Optional[datetime] = None
+    trip_end_date: Optional[datetime] = None
+    created_at: datetime
+
+class CreatePostResponse(BaseModel):
+    message: str
+    post: PostResponse
+
+class AuthoredPost(PostResponse):
+    author: UserCard
+
+class PostsPageResponse(BaseModel):
+    posts: List[AuthoredPost]
+    # Pass back as ?cursor= for the next page; None on the last one
+    next_cursor: Optional[str] = None
@@ -0,0 +1,45 @@
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import Optional, List
+from datetime import date, datetime
+import json
+
+class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    username: str
+    email: str
+    phone_number: str
+    date_of_birth: date
+    gender: str
+    city: str
+    state: str
+    country: str
+    bio: Optional[str] = None
+    travel_preferences: Optional[List[str]] = None
+    languages_spoken: Optional[List[str]] = None
+    verification_status: str
+    is_deleted: bool
+    created_at: datetime
+    updated_at: datetime
+
+    @field_validator('travel_preferences', 'languages_spoken', mode='before')
+    @classmethod
+    def decode_json_list(cls, v):
+        # Stored as JSON text in the users table
+        if isinstance(v, str):
+            return json.loads(v)
+        return v
+
+class UserProfileResponse(UserResponse):
+    # profile_picture is deferred on the model, so only queries that undefer it can build this
+    profile_picture: Optional[str] = None
+
+class SignupResponse(BaseModel):
+    message: str
+    user: UserResponse
+
+class UpdateUserResponse(BaseModel):
+    message: str
+    user: UserResponse
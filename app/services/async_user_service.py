@@ -0,0 +1,234 @@
+# app/services/async_user_service.py
+# AsyncSession versions of the user_service functions, used when settings.DATABASE_ASYNC is on.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from sqlalchemy import select, delete, or_
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException, status, UploadFile
+from starlette.concurrency import run_in_threadpool
+from app.models import User, JwtSession, RefreshToken, TokenBlacklist
+from app.requests.signup_request import SignupRequest
+from app.requests.signin_request import SigninRequest
+from app.responses.user_response import UserProfileResponse
+from app.core.revocation_cache import revocation_cache
+from app.core.password_hasher import password_hasher
+from app.core.session_writer import jwt_session_writer
+from app.core.config import settings
+from app.core.mysql_connection import async_engine, pin_to_primary, primary_bind
+from app.core.advisory_lock import advisory_lock_async
+from app.core.user_profile_cache import user_profile_cache
+from app.core.availability_filter import availability_filter
+from app.core.image_store import profile_picture_store
+from app.services.user_service import REFRESH_TOKEN_EXPIRY, revocation_watermark_upsert
+from datetime import datetime, timedelta
+
+def _user_query(columnToUndefer: str = None):
+    query = select(User)
+
+    if columnToUndefer and hasattr(User, columnToUndefer):
+        query = query.options(undefer(getattr(User, columnToUndefer)))
+
+    return query
+
+async def get_user_by_email_or_username(db: AsyncSession, email: str = None, username: str = None, columnToUndefer: str = None):
+    # Retrieve a user by email or username.
+    query = _user_query(columnToUndefer).filter(or_(User.username == username, User.email == email))
+    return (await db.execute(query.limit(1))).scalars().first()
+
+async def get_user_by_id(db: AsyncSession, user_id: int, columnToUndefer: str = None):
+    """Retrieve a user by ID."""
+    query = _user_query(columnToUndefer).filter(User.id == user_id)
+    return (await db.execute(query)).scalars().first()
+
+async def get_cached_user_profile(db: AsyncSession, user_id: int):
+    """Return the serialized profile of a user, from the profile cache when possible."""
+    profile = user_profile_cache.get(user_id)
+    if profile is None:
+        # Filled from the primary, as in user_service.get_cached_user_profile
+        query = _user_query('profile_picture').filter(User.id == user_id)
+        user = (await db.execute(query, bind_arguments=primary_bind(db))).scalars().first()
+        if not user:
+            return None
+        profile = UserProfileResponse.model_validate(user).model_dump(mode='json')
+        user_profile_cache.set(user_id, profile)
+    return profile
+
+async def authenticate_user(db: AsyncSession, signin_request: SigninRequest):
+    user = await get_user_by_email_or_username(db, signin_request.username, signin_request.username, 'password')
+
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+
+    if user.is_deleted:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="This account has been deleted")
+
+    if not await password_hasher.verify_async(signin_request.password, user.password):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    # Upgrade hashes created with an older cost factor while we have the plain password
+    if password_hasher.needs_rehash(user.password):
+        user.password = await password_hasher.hash_async(signin_request.password)
+        await db.commit()
+
+    return user
+
+async def create_or_restore_user(db: AsyncSession, user_data: SignupRequest) -> User:
+    """Create a new user or restore a deleted user in the database."""
+    # Always checked against the database: the availability filter can lag behind other workers
+    # and email changes, so it only short-circuits the availability endpoint
+    existing_user = await get_user_by_email_or_username(db, user_data.email, user_data.username)
+
+    if existing_user:
+        if not existing_user.is_deleted:
+            # User exists and is not deleted
+            if existing_user.email == user_data.email:
+                raise HTTPException(status_code=400, detail="Email already registered")
+            else:
+                raise HTTPException(status_code=400, detail="Username already exists")
+
+        # Restore the deleted user
+        for key, value in user_data.model_dump(exclude={'username', 'email', 'password'}).items():
+            setattr(existing_user, key, value)
+        existing_user.is_deleted = False
+        existing_user.password = await password_hasher.hash_async(user_data.password)
+        existing_user.updated_at = datetime.utcnow()
+        await db.commit()
+        user_profile_cache.invalidate(existing_user.id)
+        await db.refresh(existing_user)
+        return existing_user
+
+    # Create a new user
+    new_user = User(**user_data.model_dump(exclude={'password'}))
+    new_user.password = await password_hasher.hash_async(user_data.password)
+    db.add(new_user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent signup took the username or email after the lookup above
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email or username already registered")
+    await db.refresh(new_user)
+    user_profile_cache.invalidate(new_user.id)
+    availability_filter.add(new_user.username, new_user.email)
+    return new_user
+
+async def issue_session(db: AsyncSession, user_id: int, access_token: str, expiry: datetime, refresh_token: str = None):
+    """Record a newly issued access token, and optionally its refresh token, in one transaction."""
+    issued_at = datetime.utcnow()
+    jwt_session = dict(user_id=user_id, token=access_token, issued_at=issued_at, expires_at=expiry)
+
+    if settings.SESSION_WRITE_BEHIND:
+        jwt_session_writer.enqueue(jwt_session)
+    else:
+        db.add(JwtSession(**jwt_session))
+
+    if refresh_token:
+        db.add(RefreshToken(
+            user_id=user_id,
+            token=refresh_token,
+            issued_at=issued_at,
+            expires_at=issued_at + timedelta(minutes=REFRESH_TOKEN_EXPIRY)
+        ))
+
+    if db.new:
+        await db.commit()
+    pin_to_primary(user_id)
+
+async def update_user(db: AsyncSession, user_id: int, user_update: dict):
+    """Update an existing user."""
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    for key, value in user_update.items():
+        setattr(user, key, value)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    user_profile_cache.invalidate(user_id)
+    pin_to_primary(user_id)
+    await db.refresh(user)
+    if "email" in user_update:
+        # Otherwise the availability endpoint would report the new email as free
+        availability_filter.add(user.username, user.email)
+    return user
+
+async def delete_user(db: AsyncSession, user_id: int):
+    """Delete a user."""
+    user = await get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user.is_deleted = True
+    await db.commit()
+    user_profile_cache.invalidate(user_id)
+
+    # remove all logged in sessions
+    await logout_all_sessions(user_id, db)
+
+async def blacklist_token(token: str, db: AsyncSession):
+    # Add the JWT to the blacklist
+    db.add(TokenBlacklist(token=token, blacklisted_at=datetime.utcnow()))
+    await db.commit()
+    revocation_cache.mark_revoked(token)
+
+async def delete_refresh_token(refresh_token: str, user_id: int, db: AsyncSession):
+    # Delete the specific refresh token for the current session
+    await db.execute(delete(RefreshToken).filter(
+        RefreshToken.token == refresh_token,
+        RefreshToken.user_id == user_id
+    ))
+    await db.commit()
+
+async def logout_all_sessions(user_id: int, db: AsyncSession):
+    # Revoke every JWT issued to the user so far with a single watermark row
+    revoked_before = datetime.utcnow()
+    await db.execute(revocation_watermark_upsert(db.bind.dialect.name, user_id, revoked_before))
+
+    # Delete all refresh tokens for the user
+    await db.execute(delete(RefreshToken).filter(RefreshToken.user_id == user_id))
+    await db.commit()
+
+    revocation_cache.set_watermark(user_id, revoked_before)
+    pin_to_primary(user_id)
+
+async def change_user_password(db: AsyncSession, user_id: int, old_password: str, new_password: str):
+    user = await get_user_by_id(db, user_id, 'password')
+    if not user or not await password_hasher.verify_async(old_password, user.password):
+        raise HTTPException(status_code=400, detail="Invalid old password")
+
+    user.password = await password_hasher.hash_async(new_password)
+    await db.commit()
+    user_profile_cache.invalidate(user_id)
+    pin_to_primary(user_id)
+
+async def upload_user_profile_picture(file: UploadFile, user_id: int, db: AsyncSession):
+    user = await get_user_by_id(db, user_id, 'profile_picture')
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    file_name, temp_path = await profile_picture_store.stage(file)
+    previous_picture = user.profile_picture
+
+    # Same locking as user_service._point_at_picture and _remove_unreferenced_picture
+    async with advisory_lock_async(async_engine, profile_picture_store.lock_name(file_name), settings.PROFILE_PICTURE_LOCK_TIMEOUT) as locked:
+        if not locked:
+            await run_in_threadpool(profile_picture_store.discard, temp_path)
+            raise HTTPException(status_code=503, detail="Profile picture is busy, please try again")
+        # File moves and the shared cache tier block, so they run in the threadpool
+        await run_in_threadpool(profile_picture_store.place, file_name, temp_path)
+        user.profile_picture = file_name
+        await db.commit()
+    await run_in_threadpool(user_profile_cache.invalidate, user_id)
+    pin_to_primary(user_id)
+
+    # Images are shared between users who uploaded the same bytes
+    if previous_picture and previous_picture != file_name:
+        async with advisory_lock_async(async_engine, profile_picture_store.lock_name(previous_picture), settings.PROFILE_PICTURE_LOCK_TIMEOUT) as locked:
+            if locked and not (await db.execute(select(User.id).filter(User.profile_picture == previous_picture).limit(1))).first():
+                await profile_picture_store.remove(previous_picture)
+            await db.commit()
+
+    return file_name
@@ -0,0 +1,106 @@
+# app/services/feed_service.py
+
+from heapq import merge
+from operator import itemgetter
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, aliased
+from starlette.concurrency import run_in_threadpool
+from app.models import Friend, Post
+from app.core.config import settings
+from app.core.feed_writer import feed_writer
+from app.core.friend_graph import friend_graph
+from app.core.mysql_connection import pin_to_primary
+from app.requests.create_post_request import CreatePostRequest
+from app.services.post_service import load_posts
+from app.utils.pagination import encode_id_cursor, decode_id_cursor
+
+def _friend_ids(db: Session, user_id: int) -> list:
+    if friend_graph.ready:
+        return friend_graph.friends_of(user_id)
+    return db.scalars(select(Friend.friend_id).where(Friend.user_id == user_id)).all()
+
+def _pulled_author_ids(db: Session, user_id: int) -> list:
+    """Friends of the user whose posts are not fanned out, so the feed read has to fetch them."""
+    if friend_graph.ready:
+        return friend_graph.high_degree_friends(user_id, settings.FEED_FANOUT_MAX_FRIENDS)
+    theirs = aliased(Friend)
+    degree = select(func.count()).where(theirs.user_id == Friend.friend_id).scalar_subquery()
+    return db.scalars(
+        select(Friend.friend_id).where(Friend.user_id == user_id, degree >= settings.FEED_FANOUT_MAX_FRIENDS)
+    ).all()
+
+def create_post(db: Session, user_id: int, post_request: CreatePostRequest) -> Post:
+    """
+    Store a post and fan it out to the feeds of the author's friends.
+
+    The fan-out only queues one entry per recipient on the feed writer, which upserts them into
+    MongoDB in batches, so the request does not wait on a write per friend. Authors with at
+    least FEED_FANOUT_MAX_FRIENDS friends are only pushed to their own feed; get_feed pulls
+    their posts in at read time instead.
+    """
+    post = Post(user_id=user_id, **post_request.model_dump())
+    db.add(post)
+    db.commit()
+    db.refresh(post)
+
+    friend_ids = _friend_ids(db, user_id)
+    recipient_ids = [user_id] if len(friend_ids) >= settings.FEED_FANOUT_MAX_FRIENDS else [user_id, *friend_ids]
+    feed_writer.enqueue(recipient_ids, {"post_id": post.id, "author_id": user_id})
+    pin_to_primary(user_id)
+    return post
+
+async def _pushed_items(user_id: int, before: Optional[int], count: int) -> list:
+    # The feed document is kept sorted newest first, so slicing after the cursor is the page
+    items = "$items" if before is None else {"$filter": {"input": "$items", "cond": {"$lt": ["$$this.post_id", before]}}}
+    pipeline = [
+        {"$match": {"_id": user_id}},
+        {"$project": {"_id": 0, "items": {"$slice": [items, count]}}},
+    ]
+    documents = await feed_writer.collection.aggregate(pipeline).to_list(1)
+    return documents[0]["items"] if documents else []
+
+def _pulled_items(db: Session, user_id: int, before: Optional[int], count: int) -> list:
+    author_ids = _pulled_author_ids(db, user_id)
+    if not author_ids:
+        return []
+    query = (
+        select(Post.id.label("post_id"), Post.user_id.label("author_id"))
+        .where(Post.user_id.in_(author_ids), Post.is_deleted.is_(False))
+        .order_by(Post.id.desc())
+        .limit(count)
+    )
+    if before is not None:
+        query = query.where(Post.id < before)
+    return [row._asdict() for row in db.execute(query)]
+
+async def get_feed(db: Session, user_id: int, limit: int, cursor: Optional[str] = None, picture_size: Optional[int] = None) -> dict:
+    """
+    One page of the user's home feed, newest first.
+
+    Merges the user's pushed feed document with the recent posts of high-degree friends, both
+    keyset paged on post id (MongoDB keeps only millisecond timestamps, ids are exact and
+    follow creation order), then loads the page's posts and authors in one query.
+    """
+    before = decode_id_cursor(cursor) if cursor is not None else None
+    count = limit + 1
+    pushed = await _pushed_items(user_id, before, count)
+    pulled = await run_in_threadpool(_pulled_items, db, user_id, before, count)
+
+    page, seen = [], set()
+    # An author who crossed the fan-out threshold has posts on both sides, and a retried
+    # flush can push an item twice
+    for item in merge(pushed, pulled, key=itemgetter("post_id"), reverse=True):
+        if item["post_id"] in seen:
+            continue
+        seen.add(item["post_id"])
+        page.append(item)
+
+    # Decided by the fetches rather than the merged page, which duplicates can leave short of
+    # limit + 1 even though either side has more
+    has_more = len(page) > limit or len(pushed) == count or len(pulled) == count
+    page = page[:limit]
+    next_cursor = encode_id_cursor(page[-1]["post_id"]) if has_more and page else None
+    # Posts deleted since they were fanned out just drop out of the page
+    posts = await run_in_threadpool(load_posts, db, [item["post_id"] for item in page], picture_size)
+    return {"posts": posts, "next_cursor": next_cursor}
@@ -0,0 +1,223 @@
+# app/services/friend_service.py
+
+from typing import List, Optional
+from datetime import datetime
+from fastapi import HTTPException, status
+from sqlalchemy import and_, exists, func, or_, select, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session, aliased
+from app.models import Friend, FriendRequest, User
+from app.models.friend_request import FriendRequestStatus
+from app.core.friend_graph import friend_graph
+from app.core.mysql_connection import pin_to_primary
+from app.core.image_store import profile_picture_store
+from app.utils.pagination import encode_cursor, decode_cursor
+
+CARD_COLUMNS = (User.id, User.username, User.name, User.profile_picture, User.city, User.country)
+
+def user_card(card: dict, picture_size: Optional[int]) -> dict:
+    if picture_size and card["profile_picture"]:
+        card["profile_picture"] = profile_picture_store.resolve(card["profile_picture"], picture_size)
+    return card
+
+def list_friends(db: Session, user_id: int, limit: int, cursor: Optional[str] = None, picture_size: Optional[int] = None) -> dict:
+    """
+    One page of a user's friends, newest first, as compact cards.
+
+    Pages are keyset paginated on (created_at, friend_id), which the
+    ix_friends_user_id_created_at_friend_id index serves directly, so a page deep into the
+    list costs the same as the first one; OFFSET would scan every row before it.
+    """
+    query = (
+        select(*CARD_COLUMNS, Friend.created_at.label("friends_since"))
+        .join(User, User.id == Friend.friend_id)
+        .where(Friend.user_id == user_id, User.is_deleted.is_(False))
+        .order_by(Friend.created_at.desc(), Friend.friend_id.desc())
+        # One extra row tells us whether there is a next page
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        created_at, friend_id = decode_cursor(cursor)
+        # The redundant <= bound is what lets the planner start an index range at the cursor;
+        # with bound parameters the OR alone is only applied as a filter over every row before it
+        query = query.where(
+            Friend.created_at <= created_at,
+            or_(Friend.created_at < created_at, and_(Friend.created_at == created_at, Friend.friend_id < friend_id)),
+        )
+
+    rows = db.execute(query).all()
+    next_cursor = encode_cursor(rows[limit - 1].friends_since, rows[limit - 1].id) if len(rows) > limit else None
+    return {"friends": [user_card(row._asdict(), picture_size) for row in rows[:limit]], "next_cursor": next_cursor}
+
+# The self-joins the friend graph replaces, still used until it has loaded
+
+def _mutual_friends_query(user_id: int, other_id: int):
+    mine, theirs = aliased(Friend), aliased(Friend)
+    return (
+        select(func.count())
+        .select_from(mine)
+        .join(theirs, theirs.friend_id == mine.friend_id)
+        .where(mine.user_id == user_id, theirs.user_id == other_id)
+    )
+
+def _ranked_suggestions_query(user_id: int, limit: int):
+    mine, theirs = aliased(Friend), aliased(Friend)
+    already_friends = exists().where(Friend.user_id == user_id, Friend.friend_id == theirs.friend_id)
+    mutual = func.count().label("mutual_friends")
+    return (
+        select(theirs.friend_id, mutual)
+        .select_from(mine)
+        .join(theirs, theirs.user_id == mine.friend_id)
+        .where(mine.user_id == user_id, theirs.friend_id != user_id, ~already_friends)
+        .group_by(theirs.friend_id)
+        .order_by(mutual.desc(), theirs.friend_id)
+        .limit(limit)
+    )
+
+def count_mutual_friends(db: Session, user_id: int, other_id: int) -> int:
+    if friend_graph.ready:
+        return friend_graph.mutual_friends_count(user_id, other_id)
+    return db.scalar(_mutual_friends_query(user_id, other_id))
+
+def suggest_friends(db: Session, user_id: int, limit: int, picture_size: Optional[int] = None) -> dict:
+    """People the user may know, ranked by mutual friends, as compact cards."""
+    # Over-fetch a little so deleted accounts dropped below don't leave the list short
+    candidates = limit * 2
+    if friend_graph.ready:
+        ranked = friend_graph.suggestions(user_id, candidates)
+    else:
+        ranked = db.execute(_ranked_suggestions_query(user_id, candidates)).all()
+    if not ranked:
+        return {"suggestions": []}
+
+    mutual = dict(ranked)
+    rows = db.execute(select(*CARD_COLUMNS).where(User.id.in_(mutual), User.is_deleted.is_(False))).all()
+    cards = {row.id: user_card(row._asdict(), picture_size) for row in rows}
+    suggestions = [
+        {**cards[candidate_id], "mutual_friends": count}
+        for candidate_id, count in ranked if candidate_id in cards
+    ]
+    return {"suggestions": suggestions[:limit]}
+
+def send_friend_request(db: Session, sender_id: int, receiver_id: int) -> int:
+    if sender_id == receiver_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You cannot send a friend request to yourself")
+    if db.scalar(select(User.id).where(User.id == receiver_id, User.is_deleted.is_(False))) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    if db.scalar(select(Friend.id).where(Friend.user_id == sender_id, Friend.friend_id == receiver_id)) is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="You are already friends")
+
+    pending = select(FriendRequest.id).where(
+        FriendRequest.status == FriendRequestStatus.pending,
+        or_(
+            and_(FriendRequest.sender_id == sender_id, FriendRequest.receiver_id == receiver_id),
+            and_(FriendRequest.sender_id == receiver_id, FriendRequest.receiver_id == sender_id),
+        ),
+    ).limit(1)
+    if db.scalar(pending) is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A friend request between you is already pending")
+
+    friend_request = FriendRequest(sender_id=sender_id, receiver_id=receiver_id)
+    db.add(friend_request)
+    db.commit()
+    pin_to_primary(sender_id)
+    return friend_request.id
+
+def list_friend_requests(db: Session, user_id: int, box: str, request_status: FriendRequestStatus, limit: int, cursor: Optional[str] = None, picture_size: Optional[int] = None) -> dict:
+    """
+    One page of the requests a user received ("inbox") or sent ("outbox") in a status, newest
+    first, each with a card of the other user. Keyset paginated on (sent_at, id) over the
+    (receiver_id | sender_id, status, sent_at) indexes.
+    """
+    own, other = (FriendRequest.receiver_id, FriendRequest.sender_id) if box == "inbox" else (FriendRequest.sender_id, FriendRequest.receiver_id)
+    query = (
+        select(FriendRequest.id.label("request_id"), FriendRequest.sent_at, *CARD_COLUMNS)
+        .join(User, User.id == other)
+        .where(own == user_id, FriendRequest.status == request_status, User.is_deleted.is_(False))
+        .order_by(FriendRequest.sent_at.desc(), FriendRequest.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        sent_at, request_id = decode_cursor(cursor)
+        # Same redundant bound as list_friends, for the same reason
+        query = query.where(
+            FriendRequest.sent_at <= sent_at,
+            or_(FriendRequest.sent_at < sent_at, and_(FriendRequest.sent_at == sent_at, FriendRequest.id < request_id)),
+        )
+
+    rows = db.execute(query).all()
+    next_cursor = encode_cursor(rows[limit - 1].sent_at, rows[limit - 1].request_id) if len(rows) > limit else None
+    requests = []
+    for row in rows[:limit]:
+        card = row._asdict()
+        request_id, sent_at = card.pop("request_id"), card.pop("sent_at")
+        requests.append({"id": request_id, "sent_at": sent_at, "user": user_card(card, picture_size)})
+    return {"requests": requests, "next_cursor": next_cursor}
+
+def friend_edges_insert(dialect_name: str, rows: List[dict]):
+    # Both directions of each friendship in one statement; pairs that already exist are left alone
+    if dialect_name == 'sqlite':
+        return sqlite.insert(Friend).values(rows).on_conflict_do_nothing(index_elements=['user_id', 'friend_id'])
+
+    edges = mysql.insert(Friend).values(rows)
+    return edges.on_duplicate_key_update(created_at=Friend.created_at)
+
+def _lock_pending_requests(db: Session, receiver_id: int, request_ids: List[int]) -> list:
+    # Row locks keep a concurrent accept/decline of the same requests from settling them twice
+    return db.execute(
+        select(FriendRequest.id, FriendRequest.sender_id)
+        .where(
+            FriendRequest.id.in_(request_ids),
+            FriendRequest.receiver_id == receiver_id,
+            FriendRequest.status == FriendRequestStatus.pending,
+        )
+        .with_for_update()
+    ).all()
+
+def _settle(ids: List[int], new_status: FriendRequestStatus, responded_at: datetime):
+    return (
+        update(FriendRequest)
+        .where(FriendRequest.id.in_(ids))
+        .values(status=new_status, responded_at=responded_at)
+        .execution_options(synchronize_session=False)
+    )
+
+def respond_to_friend_requests(db: Session, user_id: int, request_ids: List[int], accept: bool) -> dict:
+    """
+    Accept or decline many of the user's pending requests in one transaction: a single
+    UPDATE settles them and, on accept, a single INSERT adds both directions of every new
+    friendship. Ids that aren't the user's pending requests are reported back as skipped.
+    """
+    pending = _lock_pending_requests(db, user_id, request_ids)
+    settled = [row.id for row in pending]
+    senders = sorted({row.sender_id for row in pending})
+
+    if settled:
+        now = datetime.utcnow()
+        db.execute(_settle(settled, FriendRequestStatus.accepted if accept else FriendRequestStatus.declined, now))
+        if accept:
+            # Requests the user had sent the same people are answered by this as well
+            db.execute(
+                update(FriendRequest)
+                .where(
+                    FriendRequest.sender_id == user_id,
+                    FriendRequest.receiver_id.in_(senders),
+                    FriendRequest.status == FriendRequestStatus.pending,
+                )
+                .values(status=FriendRequestStatus.accepted, responded_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            edges = [dict(user_id=user_id, friend_id=sender_id, created_at=now) for sender_id in senders]
+            edges += [dict(user_id=sender_id, friend_id=user_id, created_at=now) for sender_id in senders]
+            db.execute(friend_edges_insert(db.bind.dialect.name, edges))
+    db.commit()
+
+    if accept:
+        for sender_id in senders:
+            friend_graph.add_friendship(user_id, sender_id)
+    # The user's next friends list or inbox read should see this
+    pin_to_primary(user_id)
+
+    settled_ids = set(settled)
+    skipped = [request_id for request_id in request_ids if request_id not in settled_ids]
+    return {"accepted" if accept else "declined": settled, "skipped": skipped}
@@ -0,0 +1,106 @@
+# app/services/post_service.py
+
+from typing import Optional
+from datetime import datetime, timedelta
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+from app.models import Post, User
+from app.core.config import settings
+from app.services.friend_service import CARD_COLUMNS, user_card
+from app.utils.pagination import encode_cursor, decode_cursor
+
+POST_COLUMNS = (
+    Post.id.label("post_id"), Post.content, Post.image_url, Post.location,
+    Post.trip_start_date, Post.trip_end_date, Post.created_at,
+)
+
+def posts_by_id_query(post_ids: list):
+    return (
+        select(*POST_COLUMNS, *CARD_COLUMNS)
+        .join(User, User.id == Post.user_id)
+        .where(Post.id.in_(post_ids), Post.is_deleted.is_(False), User.is_deleted.is_(False))
+    )
+
+def load_posts(db: Session, post_ids: list, picture_size: Optional[int] = None) -> list:
+    """Posts with their author cards, in the order of post_ids, skipping deleted posts and authors."""
+    if not post_ids:
+        return []
+    rows = db.execute(posts_by_id_query(post_ids)).all()
+    posts = {}
+    for row in rows:
+        card = row._asdict()
+        post = {"id": card.pop("post_id")}
+        for column in ("content", "image_url", "location", "trip_start_date", "trip_end_date", "created_at"):
+            post[column] = card.pop(column)
+        post["author"] = user_card(card, picture_size)
+        posts[post["id"]] = post
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+def user_posts_query(user_id: int, limit: int, cursor: Optional[str] = None):
+    # Only indexed columns, so the page is read from ix_posts_user_id_is_deleted_created_at_id alone
+    query = (
+        select(Post.id, Post.created_at)
+        .where(Post.user_id == user_id, Post.is_deleted.is_(False))
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        # One extra row tells us whether there is a next page
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        created_at, post_id = decode_cursor(cursor)
+        # Redundant <= bound so the index range starts at the cursor, as in list_friends
+        query = query.where(
+            Post.created_at <= created_at,
+            or_(Post.created_at < created_at, and_(Post.created_at == created_at, Post.id < post_id)),
+        )
+    return query
+
+def trip_posts_query(location: Optional[str], start: Optional[datetime], end: Optional[datetime], limit: int, cursor: Optional[str] = None):
+    # Trips overlapping [start, end], by start date. trip_end_date is in both trip indexes, so the
+    # overlap check is made on index entries and only the page's rows are ever read.
+    # trip_end_date >= start can't bound the index range on its own; since no trip is longer than
+    # POSTS_MAX_TRIP_DAYS, an overlapping one starts at most that long before the window
+    query = (
+        select(Post.id, Post.trip_start_date)
+        .where(Post.is_deleted.is_(False), Post.trip_start_date.is_not(None))
+        .order_by(Post.trip_start_date, Post.id)
+        .limit(limit + 1)
+    )
+    if location is not None:
+        query = query.where(Post.location == location)
+    if end is not None:
+        query = query.where(Post.trip_start_date <= end)
+    if start is not None:
+        query = query.where(
+            Post.trip_start_date >= start - timedelta(days=settings.POSTS_MAX_TRIP_DAYS),
+            Post.trip_end_date >= start,
+        )
+    if cursor is not None:
+        trip_start_date, post_id = decode_cursor(cursor)
+        query = query.where(
+            Post.trip_start_date >= trip_start_date,
+            or_(Post.trip_start_date > trip_start_date, and_(Post.trip_start_date == trip_start_date, Post.id > post_id)),
+        )
+    return query
+
+def list_user_posts(db: Session, user_id: int, limit: int, cursor: Optional[str] = None, picture_size: Optional[int] = None) -> dict:
+    """One page of a user's posts, newest first, keyset paginated on (created_at, id)."""
+    if db.scalar(select(User.id).where(User.id == user_id, User.is_deleted.is_(False))) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+
+    rows = db.execute(user_posts_query(user_id, limit, cursor)).all()
+    next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    return {"posts": load_posts(db, [row.id for row in rows[:limit]], picture_size), "next_cursor": next_cursor}
+
+def list_trip_posts(db: Session, location: Optional[str], start: Optional[datetime], end: Optional[datetime], limit: int, cursor: Optional[str] = None, picture_size: Optional[int] = None) -> dict:
+    """
+    One page of posts whose trip overlaps the [start, end] window, optionally at one location,
+    in trip start order and keyset paginated on (trip_start_date, id).
+    """
+    if start and end and end < start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Trip window end cannot be before its start")
+
+    rows = db.execute(trip_posts_query(location, start, end, limit, cursor)).all()
+    next_cursor = encode_cursor(rows[limit - 1].trip_start_date, rows[limit - 1].id) if len(rows) > limit else None
+    # Posts by deleted authors drop out here, so a page can come back short
+    return {"posts": load_posts(db, [row.id for row in rows[:limit]], picture_size), "next_cursor": next_cursor}
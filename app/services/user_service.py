@@ -1,23 +1,32 @@
 # app/services/user_service.py
 
 from sqlalchemy.orm import Session, undefer
-from sqlalchemy import or_
-from sqlalchemy.dialects.mysql import insert
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import mysql, sqlite
 from fastapi import HTTPException, status, UploadFile
-from app.models import User, JwtSession, RefreshToken, TokenBlacklist
+from starlette.concurrency import run_in_threadpool
+from app.models import User, JwtSession, RefreshToken, TokenBlacklist, TokenRevocation
 from app.requests.signup_request import SignupRequest
 from app.requests.signin_request import SigninRequest
+from app.responses.user_response import UserProfileResponse
 from app.utils.helper import jwt_encode
+from app.core.revocation_cache import revocation_cache
+from app.core.password_hasher import password_hasher
+from app.core.session_writer import jwt_session_writer
+from app.core.config import settings
+from app.core.mysql_connection import engine, pin_to_primary, primary_bind
+from app.core.advisory_lock import advisory_lock
+from app.core.user_profile_cache import user_profile_cache
+from app.core.availability_filter import availability_filter
+from app.core.image_store import profile_picture_store
 from datetime import datetime, timedelta
-from uuid import uuid4
-import bcrypt
-import shutil
-import os
 import secrets
+import time
 import uuid
 
-ACCESS_TOKEN_EXPIRY = 15
-REFRESH_TOKEN_EXPIRY = 1440
+ACCESS_TOKEN_EXPIRY = settings.ACCESS_TOKEN_EXPIRY_MINUTES
+REFRESH_TOKEN_EXPIRY = settings.REFRESH_TOKEN_EXPIRY_MINUTES
 
 def get_user_by_email_or_username(db: Session, email: str = None, username: str = None, columnToUndefer: str = None):
     # Retrieve a user by email or username.
@@ -42,30 +51,30 @@ def authenticate_user(db: Session, signin_request: SigninRequest):
     
     if not verify_password(signin_request.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    # Upgrade hashes created with an older cost factor while we have the plain password
+    if password_hasher.needs_rehash(user.password):
+        user.password = get_password_hash(signin_request.password)
+        db.commit()
     
     return user
 
 def create_or_restore_user(db: Session, user_data: SignupRequest) -> User:
     """Create a new user or restore a deleted user in the database."""
+    # Always checked against the database: the availability filter can lag behind other workers
+    # and email changes, so it only short-circuits the availability endpoint
     existing_user = get_user_by_email_or_username(db, user_data.email, user_data.username)
 
     if existing_user:
         if existing_user.is_deleted:
             # Restore the deleted user
+            for key, value in user_data.model_dump(exclude={'username', 'email', 'password'}).items():
+                setattr(existing_user, key, value)
             existing_user.is_deleted = False
-            existing_user.name = user_data.name
             existing_user.password = get_password_hash(user_data.password)
-            existing_user.date_of_birth = user_data.date_of_birth
-            existing_user.gender = user_data.gender
-            existing_user.phone_number = user_data.phone_number
-            existing_user.city = user_data.city
-            existing_user.state = user_data.state
-            existing_user.country = user_data.country
-            existing_user.bio = user_data.bio
-            existing_user.travel_preferences = user_data.travel_preferences
-            existing_user.languages_spoken = user_data.languages_spoken
             existing_user.updated_at = datetime.utcnow()
             db.commit()
+            user_profile_cache.invalidate(existing_user.id)
             db.refresh(existing_user)
             return existing_user
         else:
@@ -76,33 +85,42 @@ def create_or_restore_user(db: Session, user_data: SignupRequest) -> User:
                 raise HTTPException(status_code=400, detail="Username already exists")
 
     # Create a new user
-    new_user = User(**user_data.dict(exclude={'password'}))
+    new_user = User(**user_data.model_dump(exclude={'password'}))
     new_user.password = get_password_hash(user_data.password)
     db.add(new_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent signup took the username or email after the lookup above
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email or username already registered")
     db.refresh(new_user)
+    user_profile_cache.invalidate(new_user.id)
+    availability_filter.add(new_user.username, new_user.email)
     return new_user
 
-def store_jwt_session(db: Session, user_id: int, access_token: str, expiry: datetime):
-    jwt_session = JwtSession(
-        user_id=user_id,
-        token=access_token,
-        issued_at=datetime.utcnow(),
-        expires_at=expiry
-    )
-    db.add(jwt_session)
-    db.commit()
+def issue_session(db: Session, user_id: int, access_token: str, expiry: datetime, refresh_token: str = None):
+    """Record a newly issued access token, and optionally its refresh token, in one transaction."""
+    issued_at = datetime.utcnow()
+    jwt_session = dict(user_id=user_id, token=access_token, issued_at=issued_at, expires_at=expiry)
 
-def store_refresh_token(db: Session, user_id: int, refresh_token: str):
-    expires_delta = timedelta(minutes=1440)
-    refresh_token_entry = RefreshToken(
-        user_id=user_id,   
-        token=refresh_token,
-        issued_at=datetime.utcnow(),
-        expires_at=datetime.utcnow() + expires_delta
-    )
-    db.add(refresh_token_entry)
-    db.commit()
+    if settings.SESSION_WRITE_BEHIND:
+        # jwt_sessions is audit-only, so it can be written by the batched background flush
+        jwt_session_writer.enqueue(jwt_session)
+    else:
+        db.add(JwtSession(**jwt_session))
+
+    if refresh_token:
+        db.add(RefreshToken(
+            user_id=user_id,
+            token=refresh_token,
+            issued_at=issued_at,
+            expires_at=issued_at + timedelta(minutes=REFRESH_TOKEN_EXPIRY)
+        ))
+
+    if db.new:
+        db.commit()
+    pin_to_primary(user_id)
 
 def get_user_by_id(db: Session, user_id: int, columnToUndefer: str = None):
     """Retrieve a user by ID."""
@@ -114,6 +132,20 @@ def get_user_by_id(db: Session, user_id: int, columnToUndefer: str = None):
     
     return query.filter(User.id == user_id).first()
 
+def get_cached_user_profile(db: Session, user_id: int):
+    """Return the serialized profile of a user, from the profile cache when possible."""
+    profile = user_profile_cache.get(user_id)
+    if profile is None:
+        # Filled from the primary: a lagging replica would put the pre-update profile back into
+        # the shared cache right after update_user invalidated it
+        query = select(User).options(undefer(User.profile_picture)).filter(User.id == user_id)
+        user = db.execute(query, bind_arguments=primary_bind(db)).scalars().first()
+        if not user:
+            return None
+        profile = UserProfileResponse.model_validate(user).model_dump(mode='json')
+        user_profile_cache.set(user_id, profile)
+    return profile
+
 def update_user(db: Session, user_id: int, user_update: dict):
     """Update an existing user."""
     user = get_user_by_id(db, user_id)
@@ -121,8 +153,17 @@ def update_user(db: Session, user_id: int, user_update: dict):
         raise HTTPException(status_code=404, detail="User not found")
     for key, value in user_update.items():
         setattr(user, key, value)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    user_profile_cache.invalidate(user_id)
+    pin_to_primary(user_id)
     db.refresh(user)
+    if "email" in user_update:
+        # Otherwise the availability endpoint would report the new email as free
+        availability_filter.add(user.username, user.email)
     return user
 
 def delete_user(db: Session, user_id: int):
@@ -133,6 +174,7 @@ def delete_user(db: Session, user_id: int):
     
     user.is_deleted = True
     db.commit()
+    user_profile_cache.invalidate(user_id)
     
     # remove all logged in sessions
     logout_all_sessions(user_id, db)
@@ -145,6 +187,8 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRY)
     to_encode.update({"exp": expire})
+    # Sub-second precision so a login right after a logout-all isn't caught by the watermark
+    to_encode.update({"iat": time.time()})
     to_encode.update({"jti": str(uuid.uuid4())})
     encoded_jwt = jwt_encode(to_encode)
     return {"token": encoded_jwt, "expiry": expire}
@@ -156,21 +200,20 @@ def create_refresh_token() -> str:
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
-    # Generate a salt and hash the password
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed_password.decode('utf-8')
+    # Runs in the dedicated hashing pool; raises 503 when its queue is full
+    return password_hasher.hash(password)
 
 def verify_password(password: str, hashed_password: str) -> bool:
     """Verify a password against its hash using bcrypt."""
-    # Check the password against the hashed version
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    # Runs in the dedicated hashing pool; raises 503 when its queue is full
+    return password_hasher.verify(password, hashed_password)
 
 def blacklist_token(token: str, db: Session):
     # Add the JWT to the blacklist
     blacklist_entry = TokenBlacklist(token=token, blacklisted_at=datetime.utcnow())
     db.add(blacklist_entry)
     db.commit()
+    revocation_cache.mark_revoked(token)
 
 def delete_refresh_token(refresh_token: str, user_id: int, db: Session):
     # Delete the specific refresh token for the current session
@@ -180,18 +223,27 @@ def delete_refresh_token(refresh_token: str, user_id: int, db: Session):
     ).delete()
     db.commit()
 
+def revocation_watermark_upsert(dialect_name: str, user_id: int, revoked_before: datetime):
+    # sqlite is only used as a local stand-in for MySQL
+    if dialect_name == 'sqlite':
+        watermark = sqlite.insert(TokenRevocation).values(user_id=user_id, revoked_before=revoked_before)
+        return watermark.on_conflict_do_update(index_elements=['user_id'], set_={'revoked_before': revoked_before})
+
+    watermark = mysql.insert(TokenRevocation).values(user_id=user_id, revoked_before=revoked_before)
+    return watermark.on_duplicate_key_update(revoked_before=watermark.inserted.revoked_before)
+
 def logout_all_sessions(user_id: int, db: Session):
-    # Blacklist all JWTs for the user
-    jwt_sessions = db.query(JwtSession).filter(JwtSession.user_id == user_id).all()
-    for session in jwt_sessions:
-        # blacklist_entry = TokenBlacklist(token=session.token, blacklisted_at=datetime.utcnow())
-        blacklist_entry = insert(TokenBlacklist).values(token=session.token, blacklisted_at=datetime.utcnow()).prefix_with('IGNORE')
-        db.execute(blacklist_entry)
-    
+    # Revoke every JWT issued to the user so far with a single watermark row
+    revoked_before = datetime.utcnow()
+    db.execute(revocation_watermark_upsert(db.bind.dialect.name, user_id, revoked_before))
+
     # Delete all refresh tokens for the user
     db.query(RefreshToken).filter(RefreshToken.user_id == user_id).delete()
     db.commit()
 
+    revocation_cache.set_watermark(user_id, revoked_before)
+    pin_to_primary(user_id)
+
 def change_user_password(db: Session, user_id: int, old_password: str, new_password: str):
     user = get_user_by_id(db, user_id, 'password')
     if not user or not verify_password(old_password, user.password):
@@ -200,31 +252,43 @@ def change_user_password(db: Session, user_id: int, old_password: str, new_passw
     hashed_password = get_password_hash(new_password)
     user.password = hashed_password
     db.commit()
+    user_profile_cache.invalidate(user_id)
+    pin_to_primary(user_id)
+
+def _point_at_picture(db: Session, user: User, file_name: str, temp_path: str):
+    with advisory_lock(engine, profile_picture_store.lock_name(file_name), settings.PROFILE_PICTURE_LOCK_TIMEOUT) as locked:
+        if not locked:
+            profile_picture_store.discard(temp_path)
+            raise HTTPException(status_code=503, detail="Profile picture is busy, please try again")
+        # Renamed into place, or found already stored, before the row points at it
+        profile_picture_store.place(file_name, temp_path)
+        user.profile_picture = file_name
+        db.commit()
+    # Can reach the shared cache tier, so it stays off the event loop with the rest
+    user_profile_cache.invalidate(user.id)
+    pin_to_primary(user.id)
+
+def _remove_unreferenced_picture(db: Session, file_name: str):
+    with advisory_lock(engine, profile_picture_store.lock_name(file_name), settings.PROFILE_PICTURE_LOCK_TIMEOUT) as locked:
+        # An upload of the same bytes commits under this lock, so it is either visible here or
+        # places the file again after we delete it. Without the lock, keep the file.
+        if locked and not db.query(User.id).filter(User.profile_picture == file_name).first():
+            profile_picture_store.remove_files(file_name)
+        db.commit()
 
 async def upload_user_profile_picture(file: UploadFile, user_id: int, db: Session):
-    if not file.content_type.startswith("image/"):
-        raise HTTPException(status_code=400, detail="Invalid file type. Please upload an image.")
-    
-    profile_picture_dir = "static/profile_pictures"
-    os.makedirs(profile_picture_dir, exist_ok=True)
-    
-    user = get_user_by_id(db, user_id)
+    # Every database and cache call below runs in the threadpool, never on the event loop
+    user = await run_in_threadpool(get_user_by_id, db, user_id, 'profile_picture')
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    if user.profile_picture:
-        existing_file_path = os.path.join(profile_picture_dir, user.profile_picture)
-        if os.path.exists(existing_file_path):
-            os.remove(existing_file_path)
+    file_name, temp_path = await profile_picture_store.stage(file)
+    previous_picture = user.profile_picture
 
-    file_extension = file.filename.split(".")[-1]
-    file_name = f"{uuid4()}_{user_id}.{file_extension}"
-    profile_picture_path = f"{profile_picture_dir}/{file_name}"
+    await run_in_threadpool(_point_at_picture, db, user, file_name, temp_path)
 
-    with open(profile_picture_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    
-    user.profile_picture = file_name
-    db.commit()
-    
-    return file_name
\ No newline at end of file
+    # Images are shared between users who uploaded the same bytes
+    if previous_picture and previous_picture != file_name:
+        await run_in_threadpool(_remove_unreferenced_picture, db, previous_picture)
+
+    return file_name
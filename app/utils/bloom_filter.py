@@ -0,0 +1,70 @@
+import hashlib
+import math
+import threading
+
+class BloomFilter:
+    """Thread-safe Bloom filter sized from an expected capacity and target false-positive rate."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._bits_set = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str):
+        # Kirsch-Mitzenmacher double hashing: two 64-bit halves of one digest give k positions
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        with self._lock:
+            for position in self._positions(item):
+                byte, bit = divmod(position, 8)
+                mask = 1 << bit
+                if not self._bits[byte] & mask:
+                    self._bits[byte] |= mask
+                    self._bits_set += 1
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        for position in self._positions(item):
+            byte, bit = divmod(position, 8)
+            if not bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def fill_ratio(self) -> float:
+        return self._bits_set / self.num_bits
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Current false-positive probability estimated from the fraction of bits set."""
+        return self.fill_ratio ** self.num_hashes
+
+    def stats(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "items": self.count,
+            "num_bits": self.num_bits,
+            "num_hashes": self.num_hashes,
+            "memory_bytes": len(self._bits),
+            "fill_ratio": round(self.fill_ratio, 6),
+            "estimated_false_positive_rate": self.false_positive_rate,
+        }
@@ -1,32 +1,22 @@
 import logging
-import os
-import traceback
-from datetime import datetime
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
+from app.middleware.request_body_middleware import request_body
+from app.core.config import settings
+from app.core.structured_logging import current_request_id
 
-# Directory for log files
-LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
+# Exceptions are logged as JSON lines to settings.LOG_DIR through a queue drained by a
+# background thread, with daily rotation, once the app lifespan calls configure_logging;
+# see app/core/structured_logging.py
 
-# General exception log setup
-logging.basicConfig(
-    filename=os.path.join(LOG_DIR, f"general_errors_{datetime.now().strftime('%Y-%m-%d')}.log"),
-    level=logging.ERROR,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
-# SQLAlchemy exception log setup
-db_log_handler = logging.FileHandler(os.path.join(LOG_DIR, f"database_errors_{datetime.now().strftime('%Y-%m-%d')}.log"))
-db_log_handler.setLevel(logging.ERROR)
-db_log_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+# SQLAlchemy exceptions also go to their own database_errors log
 db_logger = logging.getLogger("db_logger")
-db_logger.addHandler(db_log_handler)
-db_logger.setLevel(logging.ERROR)
+
+# Request fields that are never echoed back in validation errors
+SENSITIVE_FIELDS = {"password", "old_password", "new_password", "refresh_token"}
 
 def register_exception_handlers(app: FastAPI):
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -53,17 +43,21 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
                 "message": f"{field_name} {message}",
             })
 
+    content = {"errors": detailed_errors}
+
+    # Only decoded here, when the request actually failed validation
+    body = request_body(request) if settings.VALIDATION_ERRORS_ECHO_BODY else None
+    if isinstance(body, dict):
+        content["body"] = {key: "********" if key in SENSITIVE_FIELDS else value for key, value in body.items()}
+
     return JSONResponse(
         status_code=422,
-        content=jsonable_encoder({
-            "errors": detailed_errors
-        })
+        content=jsonable_encoder(content)
     )
 
 async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
-    # Log the database error
-    error_details = f"Database error: {str(exc)}\n{traceback.format_exc()}"
-    db_logger.error(error_details)
+    # Log the database error; the traceback is rendered by the log listener thread
+    db_logger.error("Database error: %s", exc, exc_info=exc)
 
     return JSONResponse(
         status_code=500,
@@ -72,12 +66,14 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
 
 async def general_exception_handler(request: Request, exc: Exception):
     # Log the general unexpected error
-    error_details = f"Unexpected error: {str(exc)}\n{traceback.format_exc()}"
-    logging.error(error_details)
-    
+    logging.error("Unexpected error: %s", exc, exc_info=exc)
+
+    # This response bypasses RequestContextMiddleware, so add the request id here
+    request_id = current_request_id()
     return JSONResponse(
         status_code=500,
         content={"message": "An unexpected error occurred."},
+        headers={"x-request-id": request_id} if request_id else None,
     )
 
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -1,10 +1,15 @@
 from fastapi import Depends, HTTPException, status, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
-from app.core.mysql_connection import get_db
-from app.models import TokenBlacklist, RefreshToken
+from app.core.config import settings
+from app.core.mysql_connection import get_read_db, get_async_read_db
+from app.core.revocation_cache import revocation_cache
+from app.models import RefreshToken
 from jose import jwt, JWTError
 import os
+import secrets
 
 SECRET_KEY = os.getenv("JWT_SECRET")
 ALGORITHM = "HS256"
@@ -23,7 +28,7 @@ def jwt_decode(token: str, options: dict | None = None):
             detail=str(e),
         )
 
-def verify_access_token(request: Request, db: Session = Depends(get_db)) -> int:
+def _access_token_claims(request: Request) -> tuple[str, dict]:
     token = request.headers.get("Authorization")
     
     if not token:
@@ -42,19 +47,71 @@ def verify_access_token(request: Request, db: Session = Depends(get_db)) -> int:
             detail="Invalid token payload",
         )
 
-    # Check if the token is blacklisted
-    blacklisted_token = db.query(TokenBlacklist).filter_by(token=token).first()
-    if blacklisted_token:
+    return token, payload
+
+def _raise_logged_out():
+    raise HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Session logged out! Please login again.",
+    )
+
+def verify_access_token(request: Request, db: Session = Depends(get_read_db)) -> int:
+    token, payload = _access_token_claims(request)
+    user_id = payload.get("uid")
+    # Lets read sessions keep this user on the primary right after a write
+    request.state.user_id = user_id
+
+    # Check if the token is blacklisted, only hitting the table when the local filter can't rule it out
+    if revocation_cache.is_revoked(token, db):
+        _raise_logged_out()
+
+    # Check if the token was issued before the user's last logout from all sessions.
+    # Tokens minted before iat was added are treated as issued at the epoch.
+    if revocation_cache.is_user_revoked(user_id, payload.get("iat", 0), db):
+        _raise_logged_out()
+
+    return user_id
+
+async def verify_access_token_async(request: Request, db: AsyncSession = Depends(get_async_read_db)) -> int:
+    token, payload = _access_token_claims(request)
+    user_id = payload.get("uid")
+    request.state.user_id = user_id
+
+    if await revocation_cache.is_revoked_async(token, db):
+        _raise_logged_out()
+
+    if await revocation_cache.is_user_revoked_async(user_id, payload.get("iat", 0), db):
+        _raise_logged_out()
+
+    return user_id
+
+def verify_metrics_token(request: Request):
+    # Internal counters, only for whoever holds METRICS_TOKEN; hidden entirely without one
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not secrets.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode()):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Session logged out! Please login again.",
+            detail="Invalid metrics token",
         )
 
-    return user_id
-    
 def verify_refresh_token(token: str, user_id: int, db: Session):
     token_data = db.query(RefreshToken).filter(RefreshToken.token == token, RefreshToken.user_id == user_id).first()
     if token_data and token_data.expires_at > datetime.utcnow():
         return token_data.user_id
 
     return None
+
+
+async def verify_refresh_token_async(token: str, user_id: int, db: AsyncSession):
+    result = await db.execute(
+        select(RefreshToken.user_id, RefreshToken.expires_at)
+        .filter(RefreshToken.token == token, RefreshToken.user_id == user_id)
+        .limit(1)
+    )
+    token_data = result.first()
+    if token_data and token_data.expires_at > datetime.utcnow():
+        return token_data.user_id
+
+    return None
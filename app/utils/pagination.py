@@ -0,0 +1,25 @@
+import base64
+from datetime import datetime
+from fastapi import HTTPException, status
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of the last row on a page."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split("|")
+        return datetime.fromisoformat(created_at), int(row_id)
+    except ValueError:
+        # Covers bad base64, bad UTF-8, a missing separator and unparsable values
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def encode_id_cursor(row_id: int) -> str:
+    """Opaque cursor for lists ordered by id alone."""
+    return base64.urlsafe_b64encode(str(row_id).encode()).decode().rstrip("=")
+
+def decode_id_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
@@ -0,0 +1,291 @@
+"""
+End-to-end benchmark of the auth and profile flows over real HTTP.
+
+Seeds a SQLite stand-in for MySQL with users, JWT sessions, refresh tokens and blacklist
+rows, starts the app under uvicorn against it, then drives signup, signin, refresh-token,
+user-profile, update-profile and logout in turn at the given concurrency. Prints p50/p95/p99
+latency and requests/s per endpoint and can write them as JSON, and compare against a
+previous run's JSON to catch regressions between commits.
+
+    python -m benchmarks.e2e_benchmark --users 5000 --requests 1000 --concurrency 16 \\
+        --output bench/HEAD.json --compare bench/main.json --fail-on-regression
+"""
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+import bcrypt
+import httpx
+from sqlalchemy import create_engine, insert
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENDPOINTS = ["signup", "signin", "refresh-token", "user-profile", "update-profile", "logout"]
+PASSWORD = "Passw0rd!bench"
+
+def server_env(database_path: str, args) -> dict:
+    env = dict(os.environ)
+    env.update(
+        MYSQL_USER="bench", MYSQL_PASSWORD="bench", MYSQL_HOST="localhost", MYSQL_DB="bench",
+        MONGODB_URI="mongodb://localhost:27017", MONGODB_DB="bench",
+        JWT_SECRET=env.get("JWT_SECRET", "benchmark-secret"),
+        DATABASE_URL=f"sqlite:///{database_path}",
+        ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{database_path}",
+        DATABASE_ASYNC=str(args.use_async).lower(),
+        BCRYPT_ROUNDS=str(args.bcrypt_rounds),
+        REAPER_ENABLED="false",
+        # Keep the server's log files out of the working tree
+        LOG_DIR=os.path.join(os.path.dirname(database_path), "logs"),
+        MYSQL_REPLICA_URLS="[]",
+    )
+    return env
+
+def seed(database_path: str, args):
+    # Imported late: the app reads its settings from the environment set up in main()
+    sys.path.insert(0, REPO_ROOT)
+    from app.models import User, JwtSession, RefreshToken, TokenBlacklist
+    from app.models.base import Base
+
+    engine = create_engine(f"sqlite:///{database_path}")
+    Base.metadata.create_all(engine)
+    password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=args.bcrypt_rounds)).decode()
+    now = datetime.utcnow()
+
+    users = [
+        dict(
+            username=f"seed_{index}", email=f"seed_{index}@benchmail.com", password=password, name="Bench User",
+            date_of_birth=date(1990, 1, 1), gender="other", phone_number="+1234567890", city="Pune",
+            state="Maharashtra", country="India", bio="Seeded for benchmarking",
+            travel_preferences=json.dumps(["mountains", "food"]), languages_spoken=json.dumps(["English"]),
+            created_at=now, updated_at=now,
+        )
+        for index in range(args.users)
+    ]
+    sessions = [
+        dict(user_id=user_id, token=secrets.token_urlsafe(96), issued_at=now - timedelta(hours=1), expires_at=now + timedelta(hours=1))
+        for user_id in range(1, args.users + 1)
+        for _ in range(args.sessions_per_user)
+    ]
+    refresh_tokens = [
+        dict(user_id=user_id, token=secrets.token_urlsafe(32), issued_at=now, expires_at=now + timedelta(days=1))
+        for user_id in range(1, args.users + 1)
+    ]
+    blacklist = [dict(token=secrets.token_urlsafe(96)[:255], blacklisted_at=now) for _ in range(args.blacklisted)]
+
+    with engine.begin() as connection:
+        connection.execute(insert(User), users)
+        connection.execute(insert(JwtSession), sessions)
+        connection.execute(insert(RefreshToken), refresh_tokens)
+        if blacklist:
+            connection.execute(insert(TokenBlacklist), blacklist)
+    engine.dispose()
+    return {"users": len(users), "jwt_sessions": len(sessions), "refresh_tokens": len(refresh_tokens), "token_blacklist": len(blacklist)}
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_server(env: dict, port: int, workers: int) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--no-access-log", "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env,
+    )
+
+async def wait_until_ready(base_url: str, server: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with status {server.returncode}")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+async def run_phase(client: httpx.AsyncClient, name: str, make_request, count: int, concurrency: int) -> dict:
+    """Issue `count` requests built by make_request(index) with `concurrency` in flight."""
+    latencies = []
+    statuses = {}
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < count:
+            index = next_index
+            next_index += 1
+            method, url, kwargs = make_request(index)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = response.status_code
+                on_response(name, index, response)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+    }
+
+# (access token, refresh token) pairs opened by the signin phase, reused by the phases after it
+sessions = []
+
+def on_response(phase: str, index: int, response: httpx.Response):
+    if phase == "signin" and response.status_code == 200:
+        sessions.append((response.json()["access_token"], response.cookies.get("refresh_token")))
+
+def session_headers(index: int) -> dict:
+    access_token, refresh_token = sessions[index % len(sessions)]
+    return {"headers": {"Authorization": access_token}, "cookies": {"refresh_token": refresh_token} if refresh_token else {}}
+
+def build_requests(args, run_id: str) -> dict:
+    return {
+        "signup": lambda index: ("POST", "/api/user/signup", {"json": {
+            "username": f"new_{run_id}_{index}", "email": f"new_{run_id}_{index}@benchmail.com", "password": PASSWORD,
+            "name": "New User", "date_of_birth": "1992-05-17", "gender": "female", "phone_number": "+919876543210",
+            "city": "Goa", "state": "Goa", "country": "India", "travel_preferences": ["beaches"],
+        }}),
+        "signin": lambda index: ("POST", "/api/user/signin", {"json": {"username": f"seed_{index % args.users}", "password": PASSWORD}}),
+        "refresh-token": lambda index: ("GET", "/api/user/refresh-token", session_headers(index)),
+        "user-profile": lambda index: ("GET", "/api/user/user-profile", session_headers(index)),
+        "update-profile": lambda index: ("PUT", "/api/user/update-profile", {**session_headers(index), "json": {"bio": f"Updated {index}"}}),
+        # Each session is logged out once, so this phase can't issue more requests than signin opened
+        "logout": lambda index: ("POST", "/api/user/logout", session_headers(index)),
+    }
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print the change against a baseline run and return the endpoints that regressed."""
+    regressions = []
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} (regression threshold {threshold:.0%})")
+    for endpoint, current in results["results"].items():
+        previous = baseline["results"].get(endpoint)
+        if previous is None:
+            continue
+        p95_change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] if previous["p95_ms"] else 0.0
+        rps_change = (current["rps"] - previous["rps"]) / previous["rps"] if previous["rps"] else 0.0
+        regressed = p95_change > threshold or rps_change < -threshold
+        if regressed:
+            regressions.append(endpoint)
+        print(f"  {endpoint:<16} p95 {previous['p95_ms']:8.2f} -> {current['p95_ms']:8.2f} ms ({p95_change:+.1%})"
+              f"   rps {previous['rps']:8.1f} -> {current['rps']:8.1f} ({rps_change:+.1%}){'   REGRESSION' if regressed else ''}")
+    return regressions
+
+async def drive(base_url: str, args) -> dict:
+    requests = build_requests(args, run_id=secrets.token_hex(3))
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        for endpoint in args.endpoints:
+            if endpoint != "signup" and endpoint != "signin" and not sessions:
+                # Every other flow needs a signed-in session
+                await run_phase(client, "signin", requests["signin"], min(args.requests, args.users), args.concurrency)
+                if not sessions:
+                    raise RuntimeError("No signin succeeded, so there are no sessions to benchmark with")
+            count = min(args.requests, len(sessions)) if endpoint == "logout" else args.requests
+            results[endpoint] = await run_phase(client, endpoint, requests[endpoint], count, args.concurrency)
+            stats = results[endpoint]
+            print(f"{endpoint:<16} {stats['requests']:6d} req  {stats['rps']:8.1f} req/s  p50 {stats['p50_ms']:8.2f} ms"
+                  f"  p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms  errors {stats['errors']}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000, help="seeded users")
+    parser.add_argument("--sessions-per-user", type=int, default=3, help="seeded jwt_sessions rows per user")
+    parser.add_argument("--blacklisted", type=int, default=20000, help="seeded token_blacklist rows")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12, help="lower it to benchmark everything but bcrypt")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="serve with DATABASE_ASYNC=true")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--url", help="benchmark an already running server instead of starting one (no seeding)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative p95/rps change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit with status 1 when --compare finds one")
+    args = parser.parse_args()
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "compare", "fail_on_regression")}
+    server = None
+    with tempfile.TemporaryDirectory(prefix="e2e-bench-") as workdir:
+        try:
+            if args.url:
+                base_url, seeded = args.url, None
+            else:
+                database_path = os.path.join(workdir, "bench.db")
+                env = server_env(database_path, args)
+                os.environ.update({key: env[key] for key in ("MYSQL_USER", "MYSQL_PASSWORD", "MYSQL_HOST", "MYSQL_DB", "MONGODB_URI", "MONGODB_DB", "JWT_SECRET")})
+                seeded = seed(database_path, args)
+                print(f"Seeded {seeded}")
+                port = free_port()
+                base_url = f"http://127.0.0.1:{port}"
+                server = start_server(env, port, args.workers)
+                asyncio.run(wait_until_ready(base_url, server))
+
+            results = {
+                "commit": git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "config": config,
+                "seeded": seeded,
+                "results": asyncio.run(drive(base_url, args)),
+            }
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
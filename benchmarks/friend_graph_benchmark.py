@@ -0,0 +1,97 @@
+"""
+Benchmark of the in-memory friend graph against the SQL self-joins it replaces.
+
+Seeds a SQLite database with a skewed friendship graph (low user ids are hubs), loads it
+into FriendGraph, reports load time and memory per million edges, then times mutual
+friend counts and friend-of-friend suggestions for hub and typical users both ways.
+
+    python -m benchmarks.friend_graph_benchmark --users 50000 --friendships 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import Session
+from app.models import Friend
+from app.models.base import Base
+from app.core.friend_graph import FriendGraph
+from app.services.friend_service import _mutual_friends_query, _ranked_suggestions_query
+
+def seed(engine, users: int, friendships: int, seed_value: int):
+    rng = random.Random(seed_value)
+    pairs = set()
+    while len(pairs) < friendships:
+        # Squaring skews the ids towards 1, so the first users end up with thousands of friends
+        a = int(users * rng.random() ** 2) + 1
+        b = rng.randint(1, users)
+        if a != b:
+            pairs.add((min(a, b), max(a, b)))
+    rows = [dict(user_id=a, friend_id=b) for a, b in pairs] + [dict(user_id=b, friend_id=a) for a, b in pairs]
+    with engine.begin() as connection:
+        # Only friends matters here, so skip the users rows and their foreign keys
+        connection.execute(text("PRAGMA foreign_keys = OFF"))
+        connection.execute(insert(Friend), rows)
+        connection.execute(text("ANALYZE"))
+
+def timed(function, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--friendships", type=int, default=500000, help="each is stored as two edges")
+    parser.add_argument("--max-fanout", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="friend-graph-bench-") as workdir:
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'graph.db')}")
+        Base.metadata.create_all(engine)
+        started = time.perf_counter()
+        seed(engine, args.users, args.friendships, args.seed)
+        print(f"Seeded {args.friendships * 2} edges in {time.perf_counter() - started:.1f}s")
+
+        graph = FriendGraph(max_fanout=args.max_fanout, max_delta=100000)
+        with Session(engine) as db:
+            started = time.perf_counter()
+            graph.load(db)
+            load_seconds = time.perf_counter() - started
+            # Traced separately, tracemalloc slows the load down several times
+            tracemalloc.start()
+            graph.load(db)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            stats = graph.stats()
+            print(f"Loaded in {load_seconds:.2f}s, peak {peak / 1e6:.1f} MB while loading")
+            print(f"Arrays: {stats['array_bytes'] / 1e6:.1f} MB for {stats['edges']} edges and {stats['user_id_slots']} user id slots, "
+                  f"{stats['bytes_per_million_edges'] / 1e6:.2f} MB per million edges")
+
+            degrees = sorted(((len(graph.friends_of(user_id)), user_id) for user_id in range(1, args.users + 1)), reverse=True)
+            hub, typical = degrees[0][1], degrees[len(degrees) // 2][1]
+            print(f"Hub user {hub}: {degrees[0][0]} friends, typical user {typical}: {degrees[len(degrees) // 2][0]} friends\n")
+
+            print(f"{'query':<34} {'graph ms':>10} {'sql ms':>10}")
+            for label, user_id, other_id in (("mutual count, hub vs typical", hub, typical), ("mutual count, typical pair", typical, degrees[len(degrees) // 3][1])):
+                assert graph.mutual_friends_count(user_id, other_id) == db.scalar(_mutual_friends_query(user_id, other_id))
+                graph_ms = timed(lambda: graph.mutual_friends_count(user_id, other_id), args.repeat * 20)
+                sql_ms = timed(lambda: db.scalar(_mutual_friends_query(user_id, other_id)), args.repeat)
+                print(f"{label:<34} {graph_ms:>10.3f} {sql_ms:>10.3f}")
+            for label, user_id in (("suggestions, typical user", typical), ("suggestions, hub user", hub)):
+                graph_ms = timed(lambda: graph.suggestions(user_id, 20), args.repeat)
+                sql_ms = timed(lambda: db.execute(_ranked_suggestions_query(user_id, 20)).all(), args.repeat)
+                print(f"{label:<34} {graph_ms:>10.3f} {sql_ms:>10.3f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
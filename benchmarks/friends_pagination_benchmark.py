@@ -0,0 +1,118 @@
+"""
+Benchmark of friends list pages deep into a large list.
+
+Seeds a SQLite database with one well-connected user plus background friendships, walks the
+list with the keyset cursors from list_friends() and times selected pages against the same
+query paged with OFFSET. Keyset latency should stay flat from the first page to the last.
+
+    python -m benchmarks.friends_pagination_benchmark --friends 25000 --pages 1 10 100 1000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import Session
+from app.models import Friend, User
+from app.models.base import Base
+from app.services.friend_service import list_friends
+
+def seed(engine, friends: int, background_users: int, background_friends: int):
+    now = datetime.utcnow()
+    users = [
+        dict(
+            id=user_id, username=f"user_{user_id}", email=f"user_{user_id}@example.com", password="x", name=f"User {user_id}",
+            phone_number="+919876543210", date_of_birth=date(1990, 1, 1), gender="other", city="Pune", state="Maharashtra",
+            country="India", created_at=now, updated_at=now, verification_status="verified", is_deleted=user_id % 50 == 0,
+        )
+        for user_id in range(1, friends + background_users + 2)
+    ]
+    rows = []
+    # User 1 is the hub; timestamps repeat every few rows so the friend_id tiebreak matters
+    for friend_id in range(2, friends + 2):
+        created_at = now - timedelta(seconds=friend_id // 3)
+        rows.append(dict(user_id=1, friend_id=friend_id, created_at=created_at))
+        rows.append(dict(user_id=friend_id, friend_id=1, created_at=created_at))
+    for index in range(background_friends):
+        user_id = 2 + index % (friends + background_users)
+        friend_id = 2 + (index * 7919 + 1) % (friends + background_users)
+        if user_id != friend_id:
+            rows.append(dict(user_id=user_id, friend_id=friend_id, created_at=now - timedelta(seconds=index)))
+            rows.append(dict(user_id=friend_id, friend_id=user_id, created_at=now - timedelta(seconds=index)))
+
+    with engine.begin() as connection:
+        connection.execute(insert(User), users)
+        connection.execute(insert(Friend).prefix_with("OR IGNORE"), rows)
+        connection.execute(text("ANALYZE"))
+
+def offset_page(db: Session, user_id: int, limit: int, offset: int):
+    query = (
+        select(User.id, User.username, User.name, User.profile_picture, User.city, User.country, Friend.created_at)
+        .join(User, User.id == Friend.friend_id)
+        .where(Friend.user_id == user_id, User.is_deleted.is_(False))
+        .order_by(Friend.created_at.desc(), Friend.friend_id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+    return db.execute(query).all()
+
+def timed(function, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--friends", type=int, default=25000, help="friends of the benchmarked user")
+    parser.add_argument("--background-users", type=int, default=20000)
+    parser.add_argument("--background-friends", type=int, default=100000, help="friendships between other users")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="friends-bench-") as workdir:
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'friends.db')}")
+        Base.metadata.create_all(engine)
+        started = time.perf_counter()
+        seed(engine, args.friends, args.background_users, args.background_friends)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+        with Session(engine) as db:
+            # Walk the whole list once: collects the cursor in front of every page and checks
+            # that keyset paging returns each visible friend exactly once
+            cursors, seen, cursor = [None], [], None
+            while True:
+                page = list_friends(db, 1, args.page_size, cursor)
+                seen.extend(card["id"] for card in page["friends"])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+                cursors.append(cursor)
+            visible = db.execute(
+                select(Friend.friend_id).join(User, User.id == Friend.friend_id).where(Friend.user_id == 1, User.is_deleted.is_(False))
+            ).scalars().all()
+            assert len(seen) == len(set(seen)) and set(seen) == set(visible), "keyset walk skipped or repeated friends"
+            print(f"Walked {len(cursors)} pages of {args.page_size} ({len(seen)} friends)")
+
+            plan = db.execute(text("EXPLAIN QUERY PLAN SELECT created_at, friend_id FROM friends WHERE user_id = 1 ORDER BY created_at DESC, friend_id DESC")).all()
+            print("Plan (first page):", "; ".join(row[-1] for row in plan))
+
+            print(f"\n{'page':>6} {'keyset ms':>10} {'offset ms':>10}")
+            for page_number in args.pages:
+                if page_number > len(cursors):
+                    print(f"{page_number:>6}  (list only has {len(cursors)} pages)")
+                    continue
+                cursor = cursors[page_number - 1]
+                keyset = timed(lambda: list_friends(db, 1, args.page_size, cursor), args.repeat)
+                offset = timed(lambda: offset_page(db, 1, args.page_size, (page_number - 1) * args.page_size), args.repeat)
+                print(f"{page_number:>6} {keyset:>10.3f} {offset:>10.3f}")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
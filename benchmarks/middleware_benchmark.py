@@ -0,0 +1,122 @@
+"""
+Microbenchmark for the per-request cost of the request body middleware.
+
+Drives a minimal FastAPI app directly through ASGI (no sockets) with a JSON signin-sized
+body and a multipart upload, and compares no middleware, the old BaseHTTPMiddleware that
+ran request.json() on every request, and the pure-ASGI RequestBodyMiddleware.
+
+    python -m benchmarks.middleware_benchmark --requests 5000
+"""
+import argparse
+import asyncio
+import time
+from fastapi import FastAPI, Request, UploadFile
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.middleware.request_body_middleware import RequestBodyMiddleware
+from app.requests.signin_request import SigninRequest
+
+class BaseHTTPRequestBodyMiddleware(BaseHTTPMiddleware):
+    # The previous implementation, kept here as the baseline
+    async def dispatch(self, request: Request, call_next):
+        try:
+            body = await request.json()
+        except Exception:
+            body = {}
+        request.state.body = body
+        return await call_next(request)
+
+def build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/signin")
+    async def signin(signin_request: SigninRequest):
+        return {"username": signin_request.username}
+
+    @app.post("/upload")
+    async def upload(file: UploadFile):
+        return {"size": file.size}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+JSON_BODY = b'{"username": "asha.travels", "password": "S3cret!pass"}'
+BOUNDARY = b"benchmarkboundary"
+MULTIPART_BODY = (
+    b"--" + BOUNDARY + b"\r\n"
+    b'Content-Disposition: form-data; name="file"; filename="avatar.jpg"\r\n'
+    b"Content-Type: image/jpeg\r\n\r\n" + b"\xff\xd8\xff\xe0" + b"\0" * 64 * 1024 + b"\r\n"
+    b"--" + BOUNDARY + b"--\r\n"
+)
+
+def make_scope(path: str, content_type: bytes, body: bytes) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+async def call(app, path: str, content_type: bytes, body: bytes):
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+
+    status = None
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(make_scope(path, content_type, body), receive, send)
+    assert status == 200, status
+
+async def measure(app, path: str, content_type: bytes, body: bytes, requests: int) -> float:
+    for _ in range(200):
+        await call(app, path, content_type, body)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await call(app, path, content_type, body)
+    return (time.perf_counter() - started) / requests
+
+async def run(requests: int):
+    apps = {
+        "no middleware": build_app(),
+        "BaseHTTPMiddleware + request.json() (before)": build_app(BaseHTTPRequestBodyMiddleware),
+        "pure ASGI RequestBodyMiddleware (after)": build_app(RequestBodyMiddleware),
+    }
+    cases = {
+        "JSON signin": ("/signin", b"application/json", JSON_BODY),
+        "multipart upload": ("/upload", b"multipart/form-data; boundary=" + BOUNDARY, MULTIPART_BODY),
+    }
+
+    for case, (path, content_type, body) in cases.items():
+        print(case)
+        baseline = None
+        for name, app in apps.items():
+            seconds = await measure(app, path, content_type, body, requests)
+            baseline = baseline if baseline is not None else seconds
+            print(f"  {name:<46} {seconds * 1e6:8.2f} us/request   overhead {(seconds - baseline) * 1e6:+7.2f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+if __name__ == "__main__":
+    main()
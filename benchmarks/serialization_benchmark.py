@@ -0,0 +1,59 @@
+"""
+Microbenchmark for serializing a user profile response.
+
+Compares the old path (raw ORM User through jsonable_encoder and JSONResponse) with the
+typed path (UserProfileResponse built from ORM attributes, rendered by ORJSONResponse).
+
+    python -m benchmarks.serialization_benchmark --iterations 20000
+"""
+import argparse
+import json
+import timeit
+from datetime import date, datetime
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.models import User
+from app.responses.user_response import UserProfileResponse
+
+def sample_user() -> User:
+    return User(
+        id=42,
+        name="Asha Verma",
+        username="asha.travels",
+        email="asha@example.com",
+        phone_number="+919876543210",
+        profile_picture="885a3bfe-5a23-4424-85eb-be7ad160639f_42.jpg",
+        date_of_birth=date(1994, 5, 17),
+        gender="female",
+        city="Pune",
+        state="Maharashtra",
+        country="India",
+        created_at=datetime(2024, 9, 1, 10, 30),
+        updated_at=datetime(2024, 9, 12, 18, 5),
+        verification_status="verified",
+        bio="Backpacker, trekker and street-food hunter.",
+        travel_preferences=json.dumps(["mountains", "backpacking", "food", "hostels"]),
+        languages_spoken=json.dumps(["English", "Hindi", "Marathi"]),
+        is_deleted=False,
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    user = sample_user()
+    cases = {
+        "jsonable_encoder + JSONResponse (before)": lambda: JSONResponse(jsonable_encoder(user)).body,
+        "UserProfileResponse + ORJSONResponse (after)": lambda: ORJSONResponse(UserProfileResponse.model_validate(user).model_dump(mode="json")).body,
+        "cached profile dict + ORJSONResponse (cache hit)": (lambda cached: lambda: ORJSONResponse(cached).body)(
+            UserProfileResponse.model_validate(user).model_dump(mode="json")
+        ),
+    }
+
+    for name, case in cases.items():
+        seconds = min(timeit.repeat(case, number=args.iterations, repeat=5))
+        print(f"{name:<50} {seconds / args.iterations * 1e6:8.2f} us/response")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Throughput benchmark for the signup and update-profile request models.
+
+Validates a mix of valid and invalid JSON payloads the way FastAPI does for a request body
+and reports validations per second for each case.
+
+    python -m benchmarks.validation_benchmark --iterations 20000
+"""
+import argparse
+import json
+import timeit
+from pydantic import ValidationError
+from app.requests.signup_request import SignupRequest
+from app.requests.update_user_request import UpdateUserRequest
+
+VALID_SIGNUP = {
+    "username": "asha.travels",
+    "email": "asha@example.com",
+    "password": "Tr3kking!Pune",
+    "name": "Asha Verma",
+    "date_of_birth": "1994-05-17",
+    "gender": "Female",
+    "phone_number": "+919876543210",
+    "city": "Pune",
+    "state": "Maharashtra",
+    "country": "India",
+    "bio": "Backpacker, trekker and street-food hunter.",
+    "travel_preferences": ["mountains", "backpacking", "food", "hostels"],
+    "languages_spoken": ["English", "Hindi", "Marathi"],
+}
+
+INVALID_SIGNUP = {
+    **VALID_SIGNUP,
+    "username": "a!",
+    "password": "weakpass",
+    "name": "Asha 2",
+    "gender": "unknown",
+    "phone_number": "12-34",
+    "date_of_birth": "2999-01-01",
+    "travel_preferences": ["x" * 60] * 12,
+}
+
+VALID_UPDATE = {
+    "name": "Asha V",
+    "city": "Mumbai",
+    "bio": "Now based in Mumbai.",
+    "languages_spoken": ["English", "Hindi"],
+}
+
+INVALID_UPDATE = {
+    "name": "",
+    "city": "",
+    "phone_number": "abc",
+    "unknown_field": True,
+}
+
+def _validate(model, payload: dict):
+    # FastAPI hands the decoded JSON body to the model, so start from a fresh dict each time
+    try:
+        model(**payload)
+    except ValidationError:
+        pass
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    cases = {
+        "SignupRequest valid": (SignupRequest, VALID_SIGNUP),
+        "SignupRequest invalid": (SignupRequest, INVALID_SIGNUP),
+        "UpdateUserRequest valid": (UpdateUserRequest, VALID_UPDATE),
+        "UpdateUserRequest invalid": (UpdateUserRequest, INVALID_UPDATE),
+    }
+
+    for name, (model, payload) in cases.items():
+        payload = json.loads(json.dumps(payload))
+        seconds = min(timeit.repeat(lambda: _validate(model, payload), number=args.iterations, repeat=5))
+        print(f"{name:<28} {args.iterations / seconds:10.0f} validations/s  {seconds / args.iterations * 1e6:7.2f} us each")
+
+if __name__ == "__main__":
+    main()